@@ -4,6 +4,20 @@ def _get_version():
     except ImportError:
         # The package has not been installed; try setup.py install or develop
         return None
+    return version
+
+__version__ = _get_version()
+
+def get_source_version():
+    """Return the package version, marked as dirty if the package is
+    run from a git working tree that has uncommitted changes.
+
+    This runs git, so it is only done on request, such as for
+    the --version option, rather than on import.
+    """
+    version = __version__
+    if version is None:
+        return None
 
     import os
 
@@ -25,5 +39,3 @@ def _get_version():
                 version += '+dirty'
 
     return version
-
-__version__ = _get_version()
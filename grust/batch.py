@@ -0,0 +1,230 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""Support for generating multiple crates in one invocation.
+
+A batch manifest is a text file listing generation jobs, one per line.
+Each line contains whitespace-separated fields: the GIR file name,
+the output file name, and optionally the name of a custom template file.
+Blank lines and lines starting with ``#`` are ignored.
+Relative file names are resolved against the directory containing
+the manifest.
+
+The jobs can be run in parallel. In that case, the GIR files of all
+jobs and the files they include are parsed once with
+:func:`load_gir_files`, and the parsed data are handed over to the worker
+processes generating the crates in the order given by :func:`order_jobs`.
+"""
+
+import io
+import os
+
+from .giscanner.cachestore import merge_stats, take_stats
+from .giscanner.transformer import Transformer
+
+class ManifestError(Exception):
+    """Raised when a batch manifest cannot be read."""
+    pass
+
+class Job(object):
+    """A crate generation job."""
+
+    def __init__(self, girfile, output, template=None):
+        """Construct a job description.
+
+        :param girfile: name of the GIR file to generate the crate from
+        :param output: name of the output file, or ``-`` for stdout
+        :param template: name of the custom template file, or None to use
+                         the default template
+        """
+        self.girfile = girfile
+        self.output = output
+        self.template = template
+
+    def __repr__(self):
+        return 'Job({!r}, {!r}, {!r})'.format(
+                self.girfile, self.output, self.template)
+
+def _resolve_path(base_dir, path):
+    if path == '-':
+        return path
+    return os.path.join(base_dir, path)
+
+def read_manifest(filename):
+    """Read generation jobs from a batch manifest file.
+
+    :param filename: name of the manifest file
+    :return: a list of :class:`Job` objects in the order of the manifest
+    :raises ManifestError: if a line in the manifest is malformed
+    """
+    base_dir = os.path.dirname(os.path.abspath(filename))
+    jobs = []
+    with io.open(filename, encoding='utf-8') as manifest:
+        for lineno, line in enumerate(manifest, 1):
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if len(fields) not in (2, 3):
+                raise ManifestError(
+                    '{}:{}: expected GIR file, output, and optional template'
+                    .format(filename, lineno))
+            girfile = _resolve_path(base_dir, fields[0])
+            output = _resolve_path(base_dir, fields[1])
+            if len(fields) > 2:
+                template = _resolve_path(base_dir, fields[2])
+            else:
+                template = None
+            jobs.append(Job(girfile, output, template))
+    return jobs
+
+def _load_gir(args):
+    filename, types_only, with_docs = args
+    transformer = Transformer(None)
+    try:
+        parser = transformer.load_parser(filename, types_only, with_docs)
+    except Exception:
+        # The file is unreadable or malformed; the job using it
+        # will fail to parse it again, reporting the error
+        parser = None
+    return filename, parser
+
+class _StatsTask(object):
+    # A picklable wrapper of a function run by the pool workers
+
+    def __init__(self, func):
+        self._func = func
+
+    def __call__(self, arg):
+        # The pool workers exit without running the exit handlers,
+        # so the cache statistics are passed on to the parent
+        return self._func(arg), take_stats()
+
+def map_with_stats(map_func, func, iterable):
+    """Apply a function with a map function that may run it in
+    pool worker processes, gathering the cache statistics of the workers.
+
+    :param map_func: a function with the signature of the built-in `map`,
+                     such as the `map` or `imap` method of a process pool
+    :param func: a module-level function taking one argument
+    :param iterable: the arguments to apply the function to
+    :return: an iterator over the results
+    """
+    for result, stats in map_func(_StatsTask(func), iterable):
+        merge_stats(stats)
+        yield result
+
+def load_gir_files(filenames, include_dirs=None, map_func=map,
+                   with_docs=True):
+    """Load the parsed data for GIR files and all files they include.
+
+    The files are loaded in waves: first the given files, then the files
+    included by them that have not been loaded yet, and so on.
+    The given files are parsed in full, while the included files are
+    parsed in the types-only mode. The files of each wave are loaded by
+    applying a map function, which can distribute the work across
+    a process pool.
+
+    :param filenames: an iterable of GIR file names
+    :param include_dirs: a list of additional directories to search
+                         for included files
+    :param map_func: a function with the signature of the built-in `map`
+    :param with_docs: whether to load the documentation from the given
+                      files
+    :return: a dictionary mapping absolute file names to
+             :class:`grust.giscanner.girparser.GIRParser` objects,
+             suitable to be passed as the ``parsed_files`` parameter of
+             :meth:`Transformer.parse_from_gir`; the files that cannot
+             be read or parsed, and the includes that cannot be found,
+             are left out
+    """
+    locator = Transformer(None)
+    if include_dirs is not None:
+        locator.set_include_paths(include_dirs)
+    parsed_files = {}
+    failed = set()
+    pending = []
+    for filename in filenames:
+        filename = os.path.abspath(filename)
+        if filename not in pending:
+            pending.append(filename)
+    types_only = False
+    while pending:
+        args = [(filename, types_only, with_docs) for filename in pending]
+        loaded = []
+        for filename, parser in map_with_stats(map_func, _load_gir, args):
+            if parser is not None:
+                parsed_files[filename] = parser
+                loaded.append(filename)
+            else:
+                failed.add(filename)
+        included = []
+        for filename in loaded:
+            namespace = parsed_files[filename].get_namespace()
+            for include in sorted(namespace.includes):
+                path = locator._search_include(include)
+                if path is None:
+                    # Reported by the jobs needing the include
+                    continue
+                path = os.path.abspath(path)
+                if (path not in parsed_files and path not in included
+                        and path not in failed):
+                    included.append(path)
+        pending = included
+        types_only = True
+    return parsed_files
+
+def order_jobs(jobs, parsed_files):
+    """Order jobs so that crates come after the crates they depend on.
+
+    The dependencies are derived from the includes of the GIR files.
+    Jobs that do not depend on each other retain their relative order.
+
+    :param jobs: a list of :class:`Job` objects
+    :param parsed_files: a dictionary of parsed GIR files as returned by
+                         :func:`load_gir_files`
+    :return: a list of the jobs in dependency order
+    """
+    def namespace_of(job):
+        return parsed_files[os.path.abspath(job.girfile)].get_namespace()
+
+    # The jobs whose GIR files have failed to load go first;
+    # they will fail again, reporting the error
+    failed = [job for job in jobs
+              if os.path.abspath(job.girfile) not in parsed_files]
+    jobs = [job for job in jobs
+            if os.path.abspath(job.girfile) in parsed_files]
+    job_names = set(namespace_of(job).name for job in jobs)
+    ordered = []
+    done = set()
+    remaining = list(jobs)
+    while remaining:
+        deferred = []
+        for job in remaining:
+            deps = set(include.name for include in namespace_of(job).includes)
+            if (deps & job_names) - done:
+                deferred.append(job)
+            else:
+                ordered.append(job)
+        if len(deferred) == len(remaining):
+            # Circular includes; keep the manifest order for the rest
+            ordered.extend(deferred)
+            break
+        done.update(namespace_of(job).name for job in ordered)
+        remaining = deferred
+    return failed + ordered
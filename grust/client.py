@@ -0,0 +1,90 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""The client side of the generator server.
+
+The client sends its command line arguments, working directory and
+the environment variables affecting the generator to the server
+described in :mod:`grust.server`, and reproduces the output and
+the exit status of the run performed by the server. This module
+imports nothing beyond what is needed for that, to keep the client
+quick to start.
+"""
+
+import errno
+import json
+import os
+import socket
+import sys
+
+# Besides GRUST_GEN_*; other environment variables are left
+# as they are in the server
+_FORWARDED_ENVIRON_VARS = ('XDG_CACHE_HOME', 'XDG_DATA_DIRS')
+
+_RECV_SIZE = 65536
+
+def is_forwarded(name):
+    """Tell if an environment variable is passed on to the server."""
+    return name.startswith('GRUST_GEN_') or name in _FORWARDED_ENVIRON_VARS
+
+def receive_all(sock):
+    """Receive data from a socket until the peer shuts down sending."""
+    chunks = []
+    while True:
+        chunk = sock.recv(_RECV_SIZE)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+def run_client(socket_path, args):
+    """Have the server listening on a socket run the generator.
+
+    :param socket_path: the file name of the server socket
+    :param args: the command line arguments for the generator
+    :return: the exit status of the run, or None if no server
+             is listening on the socket
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(socket_path)
+        except socket.error as e:
+            if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+                return None
+            raise
+        request = {
+            'args': list(args),
+            'cwd': os.getcwd(),
+            'environ': dict((name, value)
+                            for name, value in os.environ.items()
+                            if is_forwarded(name))
+        }
+        sock.sendall(json.dumps(request).encode('utf-8'))
+        sock.shutdown(socket.SHUT_WR)
+        data = receive_all(sock)
+    finally:
+        sock.close()
+    if not data:
+        sys.exit('the generator server at {} closed the connection'
+                 ' without a response'.format(socket_path))
+    response = json.loads(data.decode('utf-8'))
+    sys.stdout.write(response['stdout'])
+    sys.stderr.write(response['stderr'])
+    return response['status']
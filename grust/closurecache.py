@@ -0,0 +1,233 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""Caching of the resolved type mapping for GIR files.
+
+Generating a crate from a GIR file involves locating and loading the
+files it includes, directly or indirectly, and resolving the types
+referred to by every node of the namespace. :class:`ClosureCache`
+saves the result of this work as one cache entry: a
+:class:`grust.mapping.RawMapper` with the types resolved, which carries
+the transformer with the namespace of the GIR file. The namespaces of
+the include closure are not stored in the entry, but as references to
+their files and digests. When the entry is loaded, they are resolved
+through the types-only cache entries of the included files, which are
+shared by all GIR files including them.
+
+The entries are found in two steps. A small record derived from the
+GIR file lists the includes in its closure and the files they were
+loaded from. If the includes are still found in the same files,
+the mapper is looked up under a key made from the digests of all these
+files, so a change in any of them results in a miss.
+
+A process generating many crates over its lifetime can also keep
+the mappers in memory, saving the cost of unpickling them.
+"""
+
+import hashlib
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from .giscanner import ast
+from .giscanner.cachestore import CacheStore, get_package_digest
+from .giscanner.transformer import Transformer
+
+
+# Persistent ID tag of the included namespaces in the stored mappers
+_INCLUDE_PID = 'include'
+
+class ClosureCache(object):
+    """A cache of resolved mappers for GIR files."""
+
+    def __init__(self, include_dirs=None, memory=None, parsed_files=None):
+        """Construct a cache for GIR files using the given additional
+        directories to search for included files.
+
+        If `memory` is given, it must be a dictionary, shared by all
+        caches constructed in the process to keep the mappers in memory.
+        A mapper found in memory is only returned if none of its input
+        files have changed, as for the entries in the cache store.
+
+        If `parsed_files` is given, it is used to look up and record
+        the parsers of the included files when a mapper is loaded,
+        as with :meth:`Transformer.parse_from_gir`.
+        """
+        self._cachestore = CacheStore()
+        self._memory = memory
+        self._locator = Transformer(None)
+        self._locator.disable_cache()
+        if include_dirs is not None:
+            self._locator.set_include_paths(include_dirs)
+        self._loader = Transformer(None, parsed_files=parsed_files)
+        self._parsed_files = parsed_files
+
+    def _get_includes_variant(self):
+        # The includes may be found in different files
+        # depending on the search path
+        searchdirs = self._locator._get_include_searchdirs()
+        digest = hashlib.sha1('\0'.join(searchdirs).encode('utf-8'))
+        return 'closure-includes {}'.format(digest.hexdigest())
+
+    def get_includes(self, transformer):
+        """Describe the includes processed by a transformer.
+
+        :param transformer: a :class:`Transformer` object
+        :return: a sorted list of tuples of the include name, version,
+                 and the absolute name of the GIR file it was loaded from
+        """
+        include_files = transformer.get_include_files()
+        return sorted((include.name, include.version, filename)
+                      for include, filename in include_files.items())
+
+    def includes_unchanged(self, includes):
+        """Check that includes are still found in the same files.
+
+        :param includes: a list as returned by :meth:`get_includes`
+        :return: True if every include is found in the file it was
+                 loaded from according to the include search path
+        """
+        for name, version, filename in includes:
+            path = self._locator._search_include(ast.Include(name, version))
+            if path is None or os.path.abspath(path) != filename:
+                return False
+        return True
+
+    def _get_variant(self, includes, with_docs):
+        # The mapper is resolved by the code of the package, which may
+        # be modified in a development tree without a version change
+        digest = hashlib.sha1(get_package_digest().encode('utf-8'))
+        for name, version, filename in includes:
+            digest.update('{}\0{}\0'.format(
+                    filename, self._cachestore.get_digest(filename))
+                    .encode('utf-8'))
+        return 'closure {} {}'.format('docs' if with_docs else 'nodocs',
+                                      digest.hexdigest())
+
+    def load(self, girfile, with_docs=True):
+        """Load the resolved mapper for a GIR file.
+
+        :param girfile: name of the GIR file
+        :param with_docs: whether the documentation is needed
+        :return: a :class:`grust.mapping.RawMapper` object, or None if
+                 it is not cached or any of the included files
+                 has changed
+        """
+        if self._memory is not None:
+            mapper = self._load_from_memory(girfile, with_docs)
+            if mapper is not None:
+                return mapper
+        includes = self._cachestore.load(girfile,
+                                         self._get_includes_variant())
+        if includes is None or not self.includes_unchanged(includes):
+            return None
+        variant = self._get_variant(includes, with_docs)
+        mapper = self._cachestore.load(girfile, variant,
+                                       persistent_load=self._load_include)
+        if mapper is not None:
+            self._remember(girfile, with_docs, includes, variant, mapper)
+        return mapper
+
+    def store(self, girfile, mapper, with_docs=True):
+        """Store the resolved mapper for a GIR file.
+
+        :param girfile: name of the GIR file
+        :param mapper: a :class:`grust.mapping.RawMapper` object
+                       with the types of all nodes resolved
+        :param with_docs: whether the documentation has been loaded
+        """
+        includes = self.get_includes(mapper.transformer)
+        variant = self._get_variant(includes, with_docs)
+        include_refs = self._get_include_refs(mapper.transformer)
+        try:
+            self._cachestore.store(
+                    girfile, mapper, variant,
+                    persistent_id=lambda obj: include_refs.get(id(obj)))
+        except pickle.PicklingError:
+            # The mapper is left uncached, but can be kept in memory
+            self._remember(girfile, with_docs, includes, variant, mapper)
+            return
+        # A new file may have shadowed an include in the search path
+        # since the list was stored
+        self._cachestore.store(girfile, includes,
+                               self._get_includes_variant(), replace=True)
+        self._remember(girfile, with_docs, includes, variant, mapper)
+
+    def _get_include_refs(self, transformer):
+        # Persistent IDs of the included namespaces, by object identity
+        include_files = dict((include.name, filename)
+                             for include, filename
+                             in transformer.get_include_files().items())
+        refs = {}
+        for name, namespace in transformer.get_included_namespaces().items():
+            filename = include_files.get(name)
+            if filename is not None:
+                refs[id(namespace)] = (
+                        _INCLUDE_PID, filename,
+                        self._cachestore.get_digest(filename))
+        return refs
+
+    def _load_include(self, pid):
+        # The included files are found unchanged when the entry is looked
+        # up, but they may have changed or gone since
+        tag, filename, digest = pid
+        if tag != _INCLUDE_PID:
+            raise pickle.UnpicklingError(
+                    'unexpected persistent ID {!r}'.format(pid))
+        try:
+            if self._cachestore.get_digest(filename) != digest:
+                raise pickle.UnpicklingError(
+                        '{} has changed'.format(filename))
+            parser = None
+            if self._parsed_files is not None:
+                parser = self._parsed_files.get(filename)
+            if parser is None:
+                parser = self._loader.load_parser(filename, types_only=True)
+                if self._parsed_files is not None:
+                    self._parsed_files[filename] = parser
+        except (IOError, OSError) as e:
+            raise pickle.UnpicklingError(str(e))
+        return parser.get_namespace()
+
+    def _get_memory_key(self, girfile, with_docs):
+        return (os.path.abspath(girfile), with_docs,
+                self._get_includes_variant())
+
+    def _load_from_memory(self, girfile, with_docs):
+        key = self._get_memory_key(girfile, with_docs)
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        digest, includes, variant, mapper = entry
+        if (self._cachestore.get_digest(girfile) == digest
+                and self.includes_unchanged(includes)
+                and self._get_variant(includes, with_docs) == variant):
+            return mapper
+        del self._memory[key]
+        return None
+
+    def _remember(self, girfile, with_docs, includes, variant, mapper):
+        # Only the latest mapper for a GIR file is kept
+        if self._memory is not None:
+            key = self._get_memory_key(girfile, with_docs)
+            self._memory[key] = (self._cachestore.get_digest(girfile),
+                                 includes, variant, mapper)
@@ -17,6 +17,7 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
 # 02110-1301  USA
 
+from mako.runtime import Context
 from ..giscanner import ast
 from ..giscanner import message
 from ..mapping import RawMapper, MappingError
@@ -28,8 +29,15 @@ class SysCrateWriter(object):
                  transformer,
                  template,
                  options,
-                 gir_filename=None):
-        self._mapper = RawMapper(transformer)
+                 gir_filename=None,
+                 mapper=None):
+        """Construct a generator for the namespace of the transformer.
+
+        If `mapper` is given, it must be a :class:`RawMapper` for
+        the transformer with the types of all nodes resolved already,
+        such as the :attr:`mapper` of another writer loaded from
+        the cache. The type resolution pass is skipped in that case.
+        """
         self._template = template
         self._options = options
         if gir_filename:
@@ -37,14 +45,26 @@ class SysCrateWriter(object):
                     (message.Position(filename=gir_filename),))
         else:
             self._message_positions = set()
-        transformer.namespace.walk(
-            lambda node, chain: self._prepare_walk(node, chain))
+        if mapper is not None:
+            self._mapper = mapper
+        else:
+            self._mapper = RawMapper(transformer)
+            transformer.namespace.walk(
+                lambda node, chain: self._prepare_walk(node, chain))
+
+    @property
+    def mapper(self):
+        """The :class:`RawMapper` with the types resolved."""
+        return self._mapper
 
     def write(self, output):
-        result = self._template.render_unicode(
-                    mapper=self._mapper,
-                    message_positions=self._message_positions)
-        output.write(result)
+        # Render straight into the output stream rather than
+        # accumulating the whole crate in a string; the template
+        # finds its arguments in the context
+        context = Context(output,
+                          mapper=self._mapper,
+                          message_positions=self._message_positions)
+        self._template.render_context(context)
 
     def _prepare_walk(self, node, chain):
         try:
@@ -22,94 +22,548 @@ from __future__ import print_function
 import argparse
 import os
 import sys
-from pkg_resources import resource_filename
-import mako
-from mako.lookup import Template, TemplateLookup
-from .giscanner.transformer import Transformer
 from .giscanner import message
-from .giscanner import utils
-from .generators.sys_crate import SysCrateWriter
-from .output import FileOutput, DirectOutput
+from .session import Session, frozen_gc
 from . import __version__ as version
 
-def output_file(name):
+# Mako, the GIR parser, the type mapper and the cache take a large part
+# of the startup time, so they are imported by the functions using them.
+# This keeps the invocations that don't generate anything, such as
+# --version, the up-to-date checks, or handing the work over to
+# the generator server, quick to run.
+
+def output_file(name, keep_unchanged=False):
+    from .output import FileOutput, DirectOutput
+
     if name == '-':
         return DirectOutput(sys.stdout)
     else:
-        return FileOutput(name, encoding='utf-8')
+        return FileOutput(name, encoding='utf-8',
+                          keep_unchanged=keep_unchanged)
+
+class _VersionAction(argparse.Action):
+    # Checking the source tree for changes runs git,
+    # so it's only done when the version is requested
+    def __init__(self, option_strings, dest=argparse.SUPPRESS,
+                 default=argparse.SUPPRESS,
+                 help="show program's version number and exit"):
+        super(_VersionAction, self).__init__(
+            option_strings=option_strings, dest=dest, default=default,
+            nargs=0, help=help)
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        from . import get_source_version
+        print('{} {}'.format(parser.prog, get_source_version()))
+        parser.exit()
 
 def _create_arg_parser():
     parser = argparse.ArgumentParser(
         description='Generate a Rust crate from GIR XML')
-    parser.add_argument('girfile', help='GIR XML file')
-    parser.add_argument('--version', action='version',
-                        version='%(prog)s ' + version)
+    parser.add_argument('girfile', nargs='?', help='GIR XML file')
+    parser.add_argument('--version', action=_VersionAction)
     parser.add_argument('--sys', dest='sys_mode', action='store_true',
                         help='generate a sys crate')
-    parser.add_argument('-o', '--output', type=output_file,
+    parser.add_argument('-o', '--output',
                         help='output file')
+    parser.add_argument('--keep-unchanged', action='store_true',
+                        help='do not overwrite output files if the content'
+                             ' has not changed, and report the files'
+                             ' that have been updated')
+    parser.add_argument('--force', action='store_true',
+                        help='generate output files even if they have been'
+                             ' generated from the same inputs before')
+    parser.add_argument('--depfile', metavar='FILE',
+                        help='write a Makefile-style dependency file listing'
+                             ' the GIR files and templates the output'
+                             ' is generated from')
     parser.add_argument('-I', '--include-dir', action='append',
                         dest='include_dirs', metavar='DIR',
                         help='add directory to include search path')
     parser.add_argument('-t', '--template',
                         help='name of the custom template file')
+    parser.add_argument('--batch', metavar='MANIFEST',
+                        help='generate crates for the jobs listed in'
+                             ' the manifest file')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='number of crates to generate in parallel'
+                             ' in batch mode')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running, and regenerate the output files'
+                             ' when the files they are generated from'
+                             ' change')
+    parser.add_argument('--server', metavar='SOCKET',
+                        default=os.environ.get('GRUST_GEN_SERVER'),
+                        help='have the generator server listening on the'
+                             ' socket do the work, if it is running;'
+                             ' defaults to GRUST_GEN_SERVER')
+    return parser
+
+def _create_cache_arg_parser():
+    parser = argparse.ArgumentParser(
+        prog='grust-gen cache',
+        description='Manage the cache of parsed GIR files')
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = True
+    subparsers.add_parser('stats',
+                          help='show the cache usage statistics')
+    prune_parser = subparsers.add_parser(
+        'prune', help='evict the least recently used cache entries')
+    prune_parser.add_argument('--max-size', metavar='SIZE',
+                              help='size to reduce the cache to, in bytes'
+                                   ' or with a K, M or G suffix; defaults'
+                                   ' to GRUST_GEN_CACHE_MAX_SIZE')
     return parser
 
+def _cache_main(args):
+    from .giscanner.cachestore import CacheStore, parse_size
+
+    arg_parser = _create_cache_arg_parser()
+    opts = arg_parser.parse_args(args)
+    cachestore = CacheStore()
+    stats = cachestore.get_stats()
+    if stats is None:
+        sys.exit('the cache is disabled')
+
+    if opts.command == 'stats':
+        lookups = stats['hits'] + stats['misses']
+        if lookups:
+            hit_ratio = 100.0 * stats['hits'] / lookups
+        else:
+            hit_ratio = 0.0
+        print('directory:  {}'.format(stats['directory']))
+        print('entries:    {}'.format(stats['entries']))
+        print('size:       {} bytes'.format(stats['size']))
+        print('hits:       {} ({:.1f}%)'.format(stats['hits'], hit_ratio))
+        print('misses:     {}'.format(stats['misses']))
+        print('time saved: {:.1f} s'.format(stats['time_saved']))
+        return 0
+
+    max_size = opts.max_size or os.environ.get('GRUST_GEN_CACHE_MAX_SIZE')
+    if not max_size:
+        arg_parser.error('--max-size or GRUST_GEN_CACHE_MAX_SIZE'
+                         ' must be given')
+    try:
+        max_size = parse_size(max_size)
+    except ValueError:
+        arg_parser.error('invalid size: {}'.format(max_size))
+    evicted, freed = cachestore.prune(max_size)
+    print('evicted {} files, freed {} bytes'.format(evicted, freed))
+    return 0
+
+def _get_input_files(girfile, transformer, template):
+    from .templating import get_template_files
+
+    files = [os.path.abspath(girfile)]
+    files.extend(filename for _, filename
+                 in sorted(transformer.get_include_files().items()))
+    files.extend(sorted(get_template_files(template)))
+    return files
+
+def _create_output_memo(girfile, output, template_name, opts):
+    if output == '-':
+        return None
+
+    from .closurecache import ClosureCache
+    from .giscanner.cachestore import get_package_digest
+    from .outputmemo import OutputMemo
+
+    params = [
+        version or '',
+        get_package_digest(),
+        os.path.abspath(template_name) if template_name else '',
+        os.environ.get('GRUST_GEN_TEMPLATE_DIR', ''),
+        # The positions in the recorded messages are relative to it
+        os.getcwd()
+    ]
+    params.extend(opts.include_dirs or ())
+    return OutputMemo(output, girfile, params,
+                      ClosureCache(opts.include_dirs))
+
+def _is_output_up_to_date(memo, opts):
+    if memo is None or opts.force or not memo.is_up_to_date():
+        return False
+    # Skipping the generation must not hide any messages
+    text, warning_count = memo.get_messages()
+    if warning_count > 0:
+        sys.stderr.write(text)
+        print('0 error(s), {:d} warning(s)'.format(warning_count),
+              file=sys.stderr)
+    return True
+
+def _generate(girfile, output_name, template, opts, parsed_files=None,
+              memo=None, depfile=None, mappers=None):
+    from .giscanner.transformer import Transformer
+    from .closurecache import ClosureCache
+    from .generators.sys_crate import SysCrateWriter
+    from .output import FileOutput, write_depfile
+    from .templating import template_uses_docs, get_template_files
+
+    logger = message.MessageLogger.get()
+    start_error_count = logger.get_error_count()
+    start_warning_count = logger.get_warning_count()
+
+    # The messages are recorded in the memo, to be reported again
+    # when the generation is skipped
+    logger.start_recording()
+    try:
+        with_docs = template_uses_docs(template)
+        closure_cache = ClosureCache(opts.include_dirs, memory=mappers,
+                                     parsed_files=parsed_files)
+        mapper = closure_cache.load(girfile, with_docs)
+        if mapper is not None:
+            gen = SysCrateWriter(transformer=mapper.transformer,
+                                 template=template,
+                                 options=opts,
+                                 gir_filename=girfile,
+                                 mapper=mapper)
+        else:
+            transformer = Transformer.parse_from_gir(
+                    girfile, opts.include_dirs,
+                    parsed_files=parsed_files,
+                    with_docs=with_docs)
+
+            gen = SysCrateWriter(transformer=transformer,
+                                 template=template,
+                                 options=opts,
+                                 gir_filename=girfile)
+
+            # Only cache the mapping if it was resolved without messages,
+            # so there are none to replay when it's loaded
+            if (logger.get_error_count() == start_error_count
+                    and logger.get_warning_count() == start_warning_count):
+                closure_cache.store(girfile, gen.mapper, with_docs)
+
+        output = output_file(output_name, keep_unchanged=opts.keep_unchanged)
+        with output as out:
+            try:
+                gen.write(out)
+            except Exception:
+                import mako.exceptions
+                error_template = mako.exceptions.text_error_template()
+                sys.stderr.write(error_template.render())
+                raise SystemExit(1)
+
+            error_count = logger.get_error_count() - start_error_count
+            warning_count = logger.get_warning_count() - start_warning_count
+            if error_count > 0 or warning_count > 0:
+                print('{:d} error(s), {:d} warning(s)'.format(error_count, warning_count),
+                      file=sys.stderr)
+            if error_count > 0:
+                raise SystemExit(2)
+    finally:
+        messages = logger.stop_recording()
+
+    if isinstance(output, FileOutput) and opts.keep_unchanged and output.updated:
+        print('updated {}'.format(output.filename), file=sys.stderr)
+
+    input_files = _get_input_files(girfile, gen.mapper.transformer, template)
+    if depfile is not None:
+        write_depfile(depfile, output_name, input_files)
+
+    if memo is not None:
+        memo.record(gen.mapper.transformer, get_template_files(template),
+                    (messages, warning_count))
+
+    return input_files
+
+def _generate_batch(manifest, opts, session):
+    from .batch import read_manifest, ManifestError
+
+    try:
+        jobs = read_manifest(manifest)
+    except (IOError, OSError, ManifestError) as e:
+        sys.exit(str(e))
+
+    jobs = [job for job in jobs
+            if not _is_output_up_to_date(_create_job_memo(job, opts), opts)]
+    if not jobs:
+        return 0
+
+    if opts.jobs > 1 and session.use_worker_processes:
+        return _generate_batch_parallel(jobs, opts)
+
+    parsed_files = session.parsed_files
+    if parsed_files is None:
+        parsed_files = {}
+    status = 0
+    for job in jobs:
+        code = _run_job(job, opts, parsed_files, session)
+        status = max(status, _report_job_failure(job, code))
+    return status
+
+def _create_job_memo(job, opts):
+    return _create_output_memo(job.girfile, job.output,
+                               job.template or opts.template, opts)
+
+def _run_job(job, opts, parsed_files, session=None):
+    import traceback
+    from .giscanner.girparser import ParseError
+
+    if session is None:
+        session = Session()
+    # The lookup records the template files used for the memo and
+    # the depfile, so each job needs its own; the compiled template
+    # modules are still reused from the module cache
+    tmpl_lookup = session.get_template_lookup()
+    try:
+        template = session.get_template(tmpl_lookup,
+                                        job.template or opts.template)
+        _generate(job.girfile, job.output, template, opts,
+                  parsed_files=parsed_files,
+                  memo=_create_job_memo(job, opts),
+                  mappers=session.mappers)
+    except SystemExit as e:
+        return e.code
+    except (IOError, OSError, ParseError) as e:
+        # A broken job must not keep the rest of the batch from
+        # being generated
+        print(e, file=sys.stderr)
+        return 1
+    except Exception:
+        # Malformed GIR data or a broken custom template
+        traceback.print_exc()
+        return 1
+    return 0
+
+def _run_watched_job(job, opts, session, watched_files=(), depfile=None):
+    # Return the files to watch for the job: the input files if
+    # the output has been generated; otherwise, the files found to be
+    # involved so far are added to the ones watched before, so that
+    # the job is retried when any of them changes.
+    import traceback
+
+    memo = _create_job_memo(job, opts)
+    if _is_output_up_to_date(memo, opts):
+        input_files = memo.get_input_files()
+        if depfile is not None:
+            from .output import write_depfile
+            write_depfile(depfile, job.output, input_files)
+        return set(input_files)
+
+    template_name = job.template or opts.template
+    files = set(watched_files)
+    files.add(os.path.abspath(job.girfile))
+    if template_name is not None:
+        files.add(os.path.abspath(template_name))
+    tmpl_lookup = session.get_template_lookup()
+    try:
+        template = session.get_template(tmpl_lookup, template_name)
+        input_files = _generate(job.girfile, job.output, template, opts,
+                                parsed_files=session.parsed_files,
+                                memo=memo, depfile=depfile,
+                                mappers=session.mappers)
+    except SystemExit as e:
+        _report_job_failure(job, e.code or 1)
+    except Exception:
+        traceback.print_exc()
+        _report_job_failure(job, 1)
+    else:
+        print('generated {}'.format(job.output), file=sys.stderr)
+        return set(input_files)
+    files.update(tmpl_lookup.template_files)
+    return files
+
+def _read_watched_manifest(manifest):
+    from .batch import read_manifest, ManifestError
+
+    try:
+        return read_manifest(manifest)
+    except (IOError, OSError, ManifestError) as e:
+        print(e, file=sys.stderr)
+        return None
+
+def _watch(jobs, opts, session, manifest=None, depfile=None):
+    from .watch import FileWatcher
+
+    watcher = FileWatcher()
+    try:
+        watched = [_run_watched_job(job, opts, session, depfile=depfile)
+                   for job in jobs]
+        while True:
+            files = set()
+            files.update(*watched)
+            if manifest is not None:
+                files.add(os.path.abspath(manifest))
+            watcher.watch(files)
+            changed = watcher.wait()
+
+            if (manifest is not None
+                    and os.path.abspath(manifest) in changed):
+                new_jobs = _read_watched_manifest(manifest)
+                if new_jobs is not None:
+                    # The outputs that are up to date are skipped
+                    jobs = new_jobs
+                    watched = [_run_watched_job(job, opts, session)
+                               for job in jobs]
+                    continue
+
+            for i, job in enumerate(jobs):
+                if watched[i] & changed:
+                    watched[i] = _run_watched_job(job, opts, session,
+                                                  watched[i], depfile)
+    except KeyboardInterrupt:
+        return 0
+
+_worker_state = None
+
+def _init_batch_worker(opts, parsed_files):
+    global _worker_state
+
+    logger = message.MessageLogger.get()
+    logger.enable_warnings((message.FATAL, message.ERROR, message.WARNING))
+    _worker_state = (opts, parsed_files)
+
+def _run_batch_worker_job(job):
+    opts, parsed_files = _worker_state
+    return job, _run_job(job, opts, parsed_files)
+
+def _job_uses_docs(job, opts, tmpl_lookup):
+    from .templating import get_template, template_uses_docs
+
+    try:
+        template = get_template(tmpl_lookup, job.template or opts.template)
+    except Exception:
+        # The job will fail to load the template, reporting the error
+        return False
+    return template_uses_docs(template)
+
+def _generate_batch_parallel(jobs, opts):
+    import multiprocessing
+    from .batch import load_gir_files, map_with_stats, order_jobs
+    from .templating import create_template_lookup
+
+    tmpl_lookup = create_template_lookup()
+    with_docs = any(_job_uses_docs(job, opts, tmpl_lookup) for job in jobs)
+
+    pool = multiprocessing.Pool(opts.jobs)
+    try:
+        parsed_files = load_gir_files((job.girfile for job in jobs),
+                                      opts.include_dirs,
+                                      map_func=pool.map,
+                                      with_docs=with_docs)
+    finally:
+        pool.close()
+        pool.join()
+
+    jobs = order_jobs(jobs, parsed_files)
+
+    # The workers receive the parsed data once at startup; on platforms
+    # where the pool forks, no serialization is involved, and the workers
+    # share the memory holding the parsed data.
+    status = 0
+    with frozen_gc():
+        pool = multiprocessing.Pool(opts.jobs,
+                                    initializer=_init_batch_worker,
+                                    initargs=(opts, parsed_files))
+        try:
+            for job, code in map_with_stats(pool.imap,
+                                            _run_batch_worker_job, jobs):
+                status = max(status, _report_job_failure(job, code))
+        finally:
+            pool.close()
+            pool.join()
+    return status
+
+def _report_job_failure(job, code):
+    if code is None:
+        code = 0
+    elif not isinstance(code, int):
+        print(code, file=sys.stderr)
+        code = 1
+    if code != 0:
+        print('{}: generation failed'.format(job.girfile), file=sys.stderr)
+    return code
+
 def generator_main():
+    args = sys.argv[1:]
+    if args[:1] == ['cache']:
+        return _cache_main(args[1:])
+    if args[:1] == ['serve']:
+        from .server import serve_main
+        return serve_main(args[1:])
+    return run_generator(args)
+
+def run_generator(args, session=None):
+    """Run the generator with the given command line arguments.
+
+    If `session` is None, the work is handed over to the generator
+    server if one is set up and running, otherwise it is done
+    in this process with a new :class:`Session`.
+    """
     arg_parser = _create_arg_parser()
-    opts = arg_parser.parse_args()
+    opts = arg_parser.parse_args(args)
+
+    if session is None:
+        # The watch mode relies on the state kept in this process,
+        # and the server runs the jobs of a batch one at a time, so
+        # a parallel batch gets done sooner in a local process pool
+        parallel_batch = opts.batch is not None and opts.jobs > 1
+        if opts.server and not opts.watch and not parallel_batch:
+            from .client import run_client
+            status = run_client(opts.server, args)
+            if status is not None:
+                if status != 0:
+                    raise SystemExit(status)
+                return 0
+        if opts.watch:
+            from .session import CachingSession
+            session = CachingSession()
+        else:
+            session = Session()
+
     if not opts.sys_mode:
         sys.exit('only --sys mode is currently supported')
 
-    output = opts.output
-    if output is None:
-        output = output_file('lib.rs')
-
     logger = message.MessageLogger.get()
     logger.enable_warnings((message.FATAL, message.ERROR, message.WARNING))
 
-    transformer = Transformer.parse_from_gir(opts.girfile, opts.include_dirs)
+    if opts.batch is not None:
+        if opts.girfile is not None or opts.output is not None:
+            arg_parser.error('--batch cannot be used with a GIR file'
+                             ' or an output file argument')
+        if opts.depfile is not None:
+            arg_parser.error('--batch cannot be used with --depfile')
+        if opts.jobs < 1:
+            arg_parser.error('the number of jobs must be positive')
+        if opts.watch:
+            jobs = _read_watched_manifest(opts.batch)
+            if jobs is None:
+                raise SystemExit(1)
+            return _watch(jobs, opts, session, manifest=opts.batch)
+        status = _generate_batch(opts.batch, opts, session)
+        if status != 0:
+            raise SystemExit(status)
+        return 0
 
-    if 'GRUST_GEN_TEMPLATE_DIR' in os.environ:
-        template_dir = os.environ['GRUST_GEN_TEMPLATE_DIR']
-    else:
-        template_dir = resource_filename(__name__, 'templates')
+    if opts.girfile is None:
+        arg_parser.error('a GIR file or --batch is required')
 
-    if 'GRUST_GEN_DISABLE_CACHE' in os.environ:
-        tmpl_module_dir = None
-    else:
-        py_suffix = '-py{}.{}'.format(sys.version_info.major,
-                                      sys.version_info.minor)
-        tmpl_module_dir = utils.get_user_cache_dir(
-                os.path.join('grust-gen', 'template-modules' + py_suffix))
-
-    tmpl_lookup = TemplateLookup(directories=[template_dir],
-                                 module_directory=tmpl_module_dir)
-    if opts.template is None:
-        template = tmpl_lookup.get_template('/sys/crate.tmpl')
-    else:
-        template = Template(filename=opts.template,
-                            lookup=tmpl_lookup)
+    output = opts.output
+    if output is None:
+        output = 'lib.rs'
 
-    gen = SysCrateWriter(transformer=transformer,
-                         template=template,
-                         options=opts,
-                         gir_filename=opts.girfile)
+    if output == '-' and opts.depfile is not None:
+        arg_parser.error('--depfile requires an output file')
 
-    with output as out:
-        try:
-            gen.write(out)
-        except Exception:
-            error_template = mako.exceptions.text_error_template()
-            sys.stderr.write(error_template.render())
-            raise SystemExit(1)
-
-        error_count = logger.get_error_count()
-        warning_count = logger.get_warning_count()
-        if error_count > 0 or warning_count > 0:
-            print('{:d} error(s), {:d} warning(s)'.format(error_count, warning_count),
-                  file=sys.stderr)
-        if error_count > 0:
-            raise SystemExit(2)
+    if opts.watch:
+        if output == '-':
+            arg_parser.error('--watch requires an output file')
+        from .batch import Job
+        return _watch([Job(opts.girfile, output, opts.template)], opts,
+                      session, depfile=opts.depfile)
+
+    memo = _create_output_memo(opts.girfile, output, opts.template, opts)
+    if _is_output_up_to_date(memo, opts):
+        if opts.depfile is not None:
+            from .output import write_depfile
+            write_depfile(opts.depfile, output, memo.get_input_files())
+        return 0
+
+    tmpl_lookup = session.get_template_lookup()
+    template = session.get_template(tmpl_lookup, opts.template)
+
+    _generate(opts.girfile, output, template, opts,
+              parsed_files=session.parsed_files, memo=memo,
+              depfile=opts.depfile, mappers=session.mappers)
 
     return 0
@@ -45,6 +45,9 @@ class Type(object):
     unresolved type can have two data sources; a "ctype" which comes
     from a C type string, or a gtype_name (from g_type_name()).
     """
+    __slots__ = ('ctype', 'gtype_name', 'origin_symbol', 'target_fundamental',
+                 'target_giname', 'target_foreign', 'is_const',
+                 'complete_ctype')
 
     def __init__(self,
                  ctype=None,
@@ -197,6 +200,8 @@ in contrast to the other create_type() functions."""
 
 
 class TypeUnknown(Type):
+    __slots__ = ()
+
     def __init__(self):
         Type.__init__(self, _target_unknown=True)
 
@@ -400,6 +405,7 @@ class Namespace(object):
         self.shared_libraries = []   # str
         self.c_includes = []         # str
         self.exported_packages = []  # str
+        self._interned_types = {}    # (name, ctype) -> Type
 
     def type_from_name(self, name, ctype=None):
         """Backwards compatibility method for older .gir files, which
@@ -407,14 +413,25 @@ only use the 'name' attribute.  If name refers to a fundamental type,
 create a Type object referncing it.  If name is already a
 fully-qualified GIName like 'Foo.Bar', returns a Type targeting it .
 Otherwise a Type targeting name qualififed with the namespace name is
-returned."""
+returned.
+
+The Type objects are interned: repeated calls with the same arguments
+return the same object, so the returned value must not be modified.
+Use clone() to get a Type that can be changed."""
+        key = (name, ctype)
+        typeval = self._interned_types.get(key)
+        if typeval is not None:
+            return typeval
         if name in type_names:
-            return Type(target_fundamental=name, ctype=ctype)
-        if '.' in name:
-            target = name
+            typeval = Type(target_fundamental=name, ctype=ctype)
         else:
-            target = '%s.%s' % (self.name, name)
-        return Type(target_giname=target, ctype=ctype)
+            if '.' in name:
+                target = name
+            else:
+                target = '%s.%s' % (self.name, name)
+            typeval = Type(target_giname=target, ctype=ctype)
+        self._interned_types[key] = typeval
+        return typeval
 
     def track(self, node):
         """Doesn't directly append the function to our own namespace,
@@ -511,6 +528,7 @@ functions via get_by_symbol()."""
 
 
 class Include(object):
+    __slots__ = ('name', 'version')
 
     def __init__(self, name, version):
         self.name = name
@@ -551,6 +569,10 @@ class Include(object):
 class Annotated(object):
     """An object which has a few generic metadata
 properties."""
+    __slots__ = ('version', 'version_doc', 'skip', 'introspectable',
+                 'attributes', 'stability', 'stability_doc', 'deprecated',
+                 'deprecated_doc', 'doc')
+
     def __init__(self):
         self.version = None
         self.version_doc = None
@@ -568,6 +590,7 @@ class Node(Annotated):
     """A node is a type of object which is uniquely identified by its
 (namespace, name) pair.  When combined with a ., this is called a
 GIName.  It's possible for nodes to contain or point to other nodes."""
+    __slots__ = ('namespace', 'name', 'foreign', 'file_positions', '_parent')
 
     c_name = property(lambda self: self.namespace.name + self.name if self.namespace else
                       self.name)
@@ -646,8 +669,12 @@ GIName.  It's possible for nodes to contain or point to other nodes."""
         pass
 
 
-class Registered:
+class Registered(object):
     """A node that (possibly) has gtype_name and get_type."""
+    # The gtype_name and get_type slots are declared in the subclasses,
+    # as slotted attributes can only come from one base class layout.
+    __slots__ = ()
+
     def __init__(self, gtype_name, get_type):
         assert (gtype_name is None and get_type is None) or \
                (gtype_name is not None and get_type is not None)
@@ -656,6 +683,8 @@ class Registered:
 
 
 class Callable(Node):
+    __slots__ = ('_retval', '_parameters', 'throws', '_instance_parameter',
+                 'shadows', 'shadowed_by', 'moved_to')
 
     def __init__(self, name, retval, parameters, throws):
         Node.__init__(self, name)
@@ -715,6 +744,7 @@ class Callable(Node):
 
 
 class Function(Callable):
+    __slots__ = ('symbol', 'is_method', 'is_constructor', 'internal_skipped')
 
     def __init__(self, name, retval, parameters, throws, symbol):
         Callable.__init__(self, name, retval, parameters, throws)
@@ -754,6 +784,7 @@ class Function(Callable):
 
 
 class ErrorQuarkFunction(Function):
+    __slots__ = ('error_domain',)
 
     def __init__(self, name, retval, parameters, throws, symbol, error_domain):
         Function.__init__(self, name, retval, parameters, throws, symbol)
@@ -761,6 +792,7 @@ class ErrorQuarkFunction(Function):
 
 
 class VFunction(Callable):
+    __slots__ = ('invoker', 'is_method')
 
     def __init__(self, name, retval, parameters, throws):
         Callable.__init__(self, name, retval, parameters, throws)
@@ -774,12 +806,16 @@ class VFunction(Callable):
 
 
 class Varargs(Type):
+    __slots__ = ()
 
     def __init__(self):
         Type.__init__(self, '<varargs>', target_fundamental='<varargs>')
 
 
 class Array(Type):
+    __slots__ = ('array_type', 'element_type', 'zeroterminated',
+                 'length_param_name', 'size')
+
     C = '<c>'
     GLIB_ARRAY = 'GLib.Array'
     GLIB_BYTEARRAY = 'GLib.ByteArray'
@@ -810,6 +846,7 @@ class Array(Type):
 
 
 class List(Type):
+    __slots__ = ('name', 'element_type')
 
     def __init__(self, name, element_type, **kwargs):
         Type.__init__(self, target_fundamental='<list>',
@@ -823,6 +860,7 @@ class List(Type):
 
 
 class Map(Type):
+    __slots__ = ('key_type', 'value_type')
 
     def __init__(self, key_type, value_type, **kwargs):
         Type.__init__(self, target_fundamental='<map>', **kwargs)
@@ -836,6 +874,7 @@ class Map(Type):
 
 
 class Alias(Node):
+    __slots__ = ('target', 'ctype')
 
     def __init__(self, name, target, ctype=None):
         Node.__init__(self, name)
@@ -845,6 +884,7 @@ class Alias(Node):
 
 class TypeContainer(Annotated):
     """A fundamental base class for Return and Parameter."""
+    __slots__ = ('type', 'nullable', 'not_nullable', 'direction', 'transfer')
 
     def __init__(self, typenode, nullable, not_nullable, transfer, direction):
         Annotated.__init__(self)
@@ -862,6 +902,8 @@ class TypeContainer(Annotated):
 
 class Parameter(TypeContainer):
     """An argument to a function."""
+    __slots__ = ('argname', 'optional', 'parent', 'scope', 'caller_allocates',
+                 'closure_name', 'destroy_name')
 
     def __init__(self, argname, typenode, direction=None,
                  transfer=None, nullable=False, optional=False,
@@ -891,6 +933,7 @@ class Parameter(TypeContainer):
 
 class Return(TypeContainer):
     """A return value from a function."""
+    __slots__ = ('parent',)
 
     def __init__(self, rtype, nullable=False, not_nullable=False,
                  transfer=None):
@@ -900,6 +943,8 @@ class Return(TypeContainer):
 
 
 class Enum(Node, Registered):
+    __slots__ = ('gtype_name', 'get_type', 'c_symbol_prefix', 'ctype',
+                 'members', 'error_domain', 'static_methods')
 
     def __init__(self, name, ctype,
                  gtype_name=None,
@@ -923,6 +968,8 @@ class Enum(Node, Registered):
 
 
 class Bitfield(Node, Registered):
+    __slots__ = ('gtype_name', 'get_type', 'ctype', 'c_symbol_prefix',
+                 'members', 'error_domain', 'static_methods')
 
     def __init__(self, name, ctype,
                  gtype_name=None,
@@ -944,6 +991,7 @@ class Bitfield(Node, Registered):
 
 
 class Member(Annotated):
+    __slots__ = ('name', 'value', 'symbol', 'nick', 'parent', 'namespace')
 
     def __init__(self, name, value, symbol, nick):
         Annotated.__init__(self)
@@ -982,6 +1030,10 @@ class Member(Annotated):
 
 
 class Compound(Node, Registered):
+    __slots__ = ('gtype_name', 'get_type', 'ctype', 'methods',
+                 'static_methods', 'fields', 'constructors', 'disguised',
+                 'c_symbol_prefix', 'tag_name')
+
     def __init__(self, name,
                  ctype=None,
                  gtype_name=None,
@@ -1032,6 +1084,8 @@ class Compound(Node, Registered):
 
 
 class Field(Annotated):
+    __slots__ = ('name', 'type', 'readable', 'writable', 'bits',
+                 'anonymous_node', 'private', 'namespace', 'parent')
 
     def __init__(self, name, typenode, readable, writable, bits=None,
                  anonymous_node=None):
@@ -1076,6 +1130,7 @@ class Field(Annotated):
 
 
 class Record(Compound):
+    __slots__ = ('is_gtype_struct_for',)
 
     def __init__(self, name,
                  ctype=None,
@@ -1097,6 +1152,7 @@ class Record(Compound):
 
 
 class Union(Compound):
+    __slots__ = ()
 
     def __init__(self, name,
                  ctype=None,
@@ -1116,6 +1172,9 @@ class Union(Compound):
 
 class Boxed(Node, Registered):
     """A boxed type with no known associated structure/union."""
+    __slots__ = ('gtype_name', 'get_type', 'c_symbol_prefix', 'constructors',
+                 'methods', 'static_methods')
+
     def __init__(self, name,
                  gtype_name=None,
                  get_type=None,
@@ -1141,6 +1200,7 @@ class Boxed(Node, Registered):
 
 
 class Signal(Callable):
+    __slots__ = ('when', 'no_recurse', 'detailed', 'action', 'no_hooks')
 
     def __init__(self, name, retval, parameters, when=None,
                  no_recurse=False, detailed=False, action=False,
@@ -1154,6 +1214,12 @@ class Signal(Callable):
 
 
 class Class(Node, Registered):
+    __slots__ = ('gtype_name', 'get_type', 'ctype', 'c_symbol_prefix',
+                 'parent_type', 'fundamental', 'unref_func', 'ref_func',
+                 'set_value_func', 'get_value_func', 'parent_chain',
+                 'glib_type_struct', 'is_abstract', 'methods',
+                 'virtual_methods', 'static_methods', 'interfaces',
+                 'constructors', 'properties', 'fields', 'signals')
 
     def __init__(self, name, parent_type,
                  ctype=None,
@@ -1205,6 +1271,10 @@ class Class(Node, Registered):
 
 
 class Interface(Node, Registered):
+    __slots__ = ('gtype_name', 'get_type', 'ctype', 'c_symbol_prefix',
+                 'parent_type', 'parent_chain', 'methods', 'signals',
+                 'static_methods', 'virtual_methods', 'glib_type_struct',
+                 'properties', 'fields', 'prerequisites', 'constructors')
 
     def __init__(self, name, parent_type,
                  ctype=None,
@@ -1244,6 +1314,7 @@ class Interface(Node, Registered):
 
 
 class Constant(Node):
+    __slots__ = ('value_type', 'value', 'ctype')
 
     def __init__(self, name, value_type, value, ctype):
         Node.__init__(self, name)
@@ -1253,6 +1324,8 @@ class Constant(Node):
 
 
 class Property(Node):
+    __slots__ = ('type', 'readable', 'writable', 'construct', 'construct_only',
+                 'transfer')
 
     def __init__(self, name, typeobj, readable, writable,
                  construct, construct_only, transfer=None):
@@ -1270,6 +1343,7 @@ class Property(Node):
 
 
 class Callback(Callable):
+    __slots__ = ('ctype',)
 
     def __init__(self, name, retval, parameters, throws, ctype=None):
         Callable.__init__(self, name, retval, parameters, throws)
@@ -23,40 +23,347 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import atexit
+import contextlib
 import errno
-import glob
+import gc
 import hashlib
+import json
+import mmap
 import os
 import shutil
-import sys
 import tempfile
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where the cache directory is not locked
+    fcntl = None
 
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 
+from .. import __version__
+from . import message
 from . import utils
 
 
-_CACHE_VERSION_FILENAME = '.cache-version'
+# Bump this when a change in the AST classes, the parser, the type mapper
+# or the entry format makes the previously stored entries unusable.
+CACHE_SCHEMA_VERSION = 6
+
+_CACHE_STATS_FILENAME = '.cache-stats'
+_LOCK_FILENAME = '.lock'
+# Names starting with a dot are not taken for cache entries
+_TEMP_FILE_PREFIX = '.tmp-'
+_STAT_RECORD_PREFIX = 'stat-'
+_HASH_BLOCK_SIZE = 64 * 1024
+_SIZE_SUFFIXES = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+try:
+    _replace_file = os.replace
+except AttributeError:
+    # Python 2; on Windows this fails if the destination exists
+    _replace_file = os.rename
+
+
+# Computed by get_package_digest() once per process
+_package_digest = None
+
+# Lookup statistics gathered by this process, per cache directory,
+# until they are merged into the statistics files by flush_stats()
+_pending_stats = {}
+_pending_stats_pid = None
+
+
+def get_package_digest():
+    """Return a digest of the source files and templates of the package.
+
+The version number stays the same as the code is modified in a development
+tree, so the entries holding results derived by the generator code, rather
+than by the parser, add the digest to their variant to tell the results
+of different code apart."""
+    global _package_digest
+    if _package_digest is None:
+        package_dir = os.path.dirname(
+                os.path.dirname(os.path.abspath(__file__)))
+        filenames = []
+        for dirpath, dirnames, names in os.walk(package_dir):
+            dirnames[:] = [name for name in dirnames
+                           if name != '__pycache__']
+            filenames.extend(os.path.join(dirpath, name) for name in names
+                             if name.endswith(('.py', '.tmpl')))
+        digest = hashlib.sha1()
+        for filename in sorted(filenames):
+            relpath = os.path.relpath(filename, package_dir)
+            digest.update(('%s %s\n' % (relpath, _hash_file(filename)))
+                          .encode('utf-8'))
+        _package_digest = digest.hexdigest()
+    return _package_digest
+
+
+def _get_version_tag():
+    return '%d %s' % (CACHE_SCHEMA_VERSION, __version__)
+
 
+def _hash_file(filename):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as source:
+        while True:
+            block = source.read(_HASH_BLOCK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
 
-def _get_versionhash():
-    toplevel = os.path.dirname(__file__)
-    sources = glob.glob(os.path.join(toplevel, '*.py'))
-    sources.append(sys.argv[0])
-    # Using mtimes is a bit (5x) faster than hashing the file contents
-    mtimes = (str(os.stat(source).st_mtime) for source in sources)
-    # ASCII encoding is sufficient since we are only dealing with numbers.
-    return hashlib.sha1(''.join(mtimes).encode('ascii')).hexdigest()
+
+def _get_stat_stamp(filename):
+    st = os.stat(filename)
+    return '%d %d %r' % (st.st_ino, st.st_size, st.st_mtime)
+
+
+def _dump_pickle(data, fd, persistent_id=None):
+    pickler = pickle.Pickler(fd, pickle.HIGHEST_PROTOCOL)
+    if persistent_id is not None:
+        pickler.persistent_id = persistent_id
+    try:
+        pickler.dump(data)
+    except (TypeError, AttributeError, RuntimeError) as e:
+        # Unpicklable objects are reported with these on Python 3,
+        # and a too deeply nested structure with RecursionError
+        raise pickle.PicklingError(str(e))
+
+
+def _load_pickle(fd, persistent_load=None):
+    unpickler = pickle.Unpickler(fd)
+    if persistent_load is not None:
+        unpickler.persistent_load = persistent_load
+    # Unpickling a namespace creates a lot of container objects at once,
+    # which would otherwise trigger many futile collection passes.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return unpickler.load()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _map_file(fd):
+    offset = fd.tell()
+    return mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ), offset
+
+
+def parse_size(text):
+    """Parse a size in bytes, optionally followed by a K, M or G suffix.
+Raises ValueError if the text is not a valid size."""
+    text = text.strip().upper()
+    multiplier = 1
+    if text[-1:] in _SIZE_SUFFIXES:
+        multiplier = _SIZE_SUFFIXES[text[-1]]
+        text = text[:-1]
+    size = int(text)
+    if size < 0:
+        raise ValueError('negative size: %s' % (text, ))
+    return size * multiplier
+
+
+def _is_entry_name(name):
+    return not (name.startswith('.') or name.startswith(_STAT_RECORD_PREFIX))
+
+
+def _remove_filename(filename):
+    try:
+        os.unlink(filename)
+    except (IOError, OSError) as e:
+        # Ignore "permission denied", "file does not exist"
+        if e.errno in (errno.EACCES, errno.ENOENT):
+            return
+        else:
+            raise
+
+
+def _write_file(filename, write_func, mode='w'):
+    # The file is written under a temporary name in the same directory
+    # and renamed into place, so that concurrent readers see either
+    # the previous or the complete new contents.
+    try:
+        tmp_fd, tmp_filename = tempfile.mkstemp(
+                prefix=_TEMP_FILE_PREFIX, dir=os.path.dirname(filename))
+    except (IOError, OSError) as e:
+        # Permission denied
+        if e.errno == errno.EACCES:
+            return False
+        else:
+            raise
+    try:
+        with os.fdopen(tmp_fd, mode) as tmp_file:
+            write_func(tmp_file)
+        _replace_file(tmp_filename, filename)
+    except BaseException as e:
+        # Including the failures to produce the data and the exits
+        # in the middle of writing, as the temporary files are not
+        # counted towards the cache size and would never be evicted
+        _remove_filename(tmp_filename)
+        # Permission denied, no space left on device, or another
+        # process has just written the file on Windows
+        if (isinstance(e, (IOError, OSError))
+                and e.errno in (errno.EACCES, errno.ENOSPC, errno.EEXIST)):
+            return False
+        else:
+            raise
+    return True
+
+
+@contextlib.contextmanager
+def _locked(directory, blocking=True):
+    # Serializes the read-modify-write updates of the cache directory
+    # between concurrently running processes.  Yields whether the lock
+    # has been acquired; it is not when not blocking and another process
+    # holds it.
+    if fcntl is None:
+        yield True
+        return
+    try:
+        lock_file = open(os.path.join(directory, _LOCK_FILENAME), 'a')
+    except (IOError, OSError) as e:
+        # Permission denied
+        if e.errno == errno.EACCES:
+            yield True
+            return
+        else:
+            raise
+    try:
+        flags = fcntl.LOCK_EX
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(lock_file.fileno(), flags)
+        except (IOError, OSError) as e:
+            if e.errno in (errno.EAGAIN, errno.EACCES, errno.EWOULDBLOCK):
+                yield False
+                return
+            else:
+                raise
+        yield True
+    finally:
+        # Closing the file releases the lock
+        lock_file.close()
+
+
+def _read_stats(directory):
+    stats_filename = os.path.join(directory, _CACHE_STATS_FILENAME)
+    try:
+        with open(stats_filename, 'r') as stats_file:
+            return json.load(stats_file)
+    except (IOError, OSError) as e:
+        if e.errno == errno.ENOENT:
+            return {}
+        else:
+            raise
+    except ValueError:
+        # Corrupted statistics; start over
+        return {}
+
+
+def _get_pending_stats():
+    global _pending_stats, _pending_stats_pid
+    pid = os.getpid()
+    if _pending_stats_pid != pid:
+        # A forked process starts afresh; the statistics inherited
+        # from the parent are flushed by the parent
+        if _pending_stats_pid is None:
+            atexit.register(flush_stats)
+        _pending_stats = {}
+        _pending_stats_pid = pid
+    return _pending_stats
+
+
+def _add_stats(stats, increments):
+    for key, value in increments.items():
+        stats[key] = stats.get(key, 0) + value
+
+
+def take_stats():
+    """Return the lookup statistics gathered by this process that have
+not been flushed, and forget them.  A worker process can hand them over
+to the parent process, to be passed to merge_stats() there."""
+    global _pending_stats
+    pending = _get_pending_stats()
+    _pending_stats = {}
+    return pending
+
+
+def merge_stats(stats):
+    """Add lookup statistics returned by take_stats() in another process
+to the statistics gathered by this process."""
+    pending = _get_pending_stats()
+    for directory, increments in stats.items():
+        _add_stats(pending.setdefault(directory, {}), increments)
+
+
+def flush_stats():
+    """Merge the lookup statistics gathered by this process into the
+statistics files of the cache directories.  This is done when the process
+exits normally; processes exiting otherwise, such as forked workers,
+should call this function before they exit, or hand the statistics over
+with take_stats().  The statistics file is
+not waited for if another process is updating it; the statistics are
+then kept for the next flush, or dropped at exit."""
+    pending = _get_pending_stats()
+    for directory, increments in list(pending.items()):
+        with _locked(directory, blocking=False) as acquired:
+            if not acquired:
+                continue
+            stats = _read_stats(directory)
+            _add_stats(stats, increments)
+            written = _write_file(
+                    os.path.join(directory, _CACHE_STATS_FILENAME),
+                    lambda f: json.dump(stats, f))
+        if written:
+            del pending[directory]
 
 
 class CacheStore(object):
+    """Stores data derived from files, such as parsed GIR files.
+
+Entries are keyed by a digest of the file contents, so they remain
+valid when the file is copied or moved, or its modification time
+changes.  To avoid hashing the file on every lookup, the digest
+is recorded along with the inode number, size and modification time
+of the file, and reused as long as these are unchanged.
+
+Besides the writable per-user cache directory, entries are looked up
+in read-only shared cache directories listed in the environment variable
+GRUST_GEN_SHARED_CACHE_DIRS, separated with os.pathsep.  A shared
+directory has the same layout as the user cache directory, and can be
+populated by running the generator with XDG_CACHE_HOME pointing to
+a staging location.  Entries found in a shared directory are copied
+into the user cache directory.
+
+Each entry is tagged with CACHE_SCHEMA_VERSION and the version of the
+package.  Entries with a different tag are ignored, and removed from
+the user cache directory when they are encountered, so that entries
+written by other versions of the generator do not get in the way.
+
+The size of the user cache directory can be limited with the environment
+variable GRUST_GEN_CACHE_MAX_SIZE, given in bytes or with a K, M or G
+suffix.  When the limit is exceeded, the least recently used entries
+are evicted, along with the records of file digests.  The number of
+cache hits and misses, and the parsing time saved by the hits, are
+counted in memory and merged into a file in the cache directory by
+flush_stats()."""
 
     def __init__(self):
         self._directory = self._get_cachedir()
-        self._check_cache_version()
+        self._digests = {}
+        self._version_tag = _get_version_tag()
+        self._shared_directories = self._get_shared_cachedirs()
+        self._max_size = self._get_max_size()
 
     def _get_cachedir(self):
         if 'GRUST_GEN_DISABLE_CACHE' in os.environ:
@@ -66,119 +373,278 @@ class CacheStore(object):
                     os.path.join('grust-gen', 'giscanner'))
             return cachedir
 
-    def _check_cache_version(self):
-        if self._directory is None:
-            return
+    def _get_shared_cachedirs(self):
+        if 'GRUST_GEN_DISABLE_CACHE' in os.environ:
+            return []
+        paths = os.environ.get('GRUST_GEN_SHARED_CACHE_DIRS')
+        if not paths:
+            return []
+        return [path for path in paths.split(os.pathsep)
+                if path and path != self._directory]
+
+    def _get_max_size(self):
+        value = os.environ.get('GRUST_GEN_CACHE_MAX_SIZE')
+        if not value:
+            return None
+        try:
+            return parse_size(value)
+        except ValueError:
+            message.warn('ignoring invalid GRUST_GEN_CACHE_MAX_SIZE value %r'
+                         % (value, ))
+            return None
+
+    def _get_stat_record_name(self, filename):
+        # Assume UTF-8 encoding for the filenames. This doesn't matter so much
+        # as long as the results of this method always produce the same hash.
+        hexdigest = hashlib.sha1(filename.encode('utf-8')).hexdigest()
+        return _STAT_RECORD_PREFIX + hexdigest
 
-        current_hash = _get_versionhash()
-        version = os.path.join(self._directory, _CACHE_VERSION_FILENAME)
+    def _read_stat_record(self, record_filename, stamp):
         try:
-            with open(version, 'r') as version_file:
-                cache_hash = version_file.read()
+            with open(record_filename, 'r') as record_file:
+                record = record_file.read()
         except (IOError, OSError) as e:
-            # File does not exist
             if e.errno == errno.ENOENT:
-                cache_hash = 0
+                return None
             else:
                 raise
+        record_stamp, _, digest = record.rpartition(' ')
+        if record_stamp != stamp or not digest:
+            return None
+        return digest
 
-        if current_hash == cache_hash:
-            return
+    def _write_stat_record(self, record_filename, stamp, digest):
+        _write_file(record_filename,
+                    lambda f: f.write('%s %s' % (stamp, digest)))
 
-        self._clean()
+    def _get_content_digest(self, filename):
+        stamp = _get_stat_stamp(filename)
+        memo = self._digests.get(filename)
+        if memo is not None and memo[0] == stamp:
+            return memo[1]
+        record_name = self._get_stat_record_name(filename)
+        digest = None
+        for directory in self._get_directories():
+            record_filename = os.path.join(directory, record_name)
+            digest = self._read_stat_record(record_filename, stamp)
+            if digest is not None:
+                # The records are evicted along with the entries
+                if directory == self._directory:
+                    self._touch(record_filename)
+                break
+        if digest is None:
+            digest = _hash_file(filename)
+            if self._directory is not None:
+                self._write_stat_record(
+                        os.path.join(self._directory, record_name),
+                        stamp, digest)
+        self._digests[filename] = (stamp, digest)
+        return digest
 
-        tmp_fd, tmp_filename = tempfile.mkstemp(prefix='grust-gen-cache-version-')
-        try:
-            with os.fdopen(tmp_fd, 'w') as tmp_file:
-                tmp_file.write(current_hash)
+    def get_digest(self, filename):
+        """Return the hex digest of the contents of a file, as used to key
+the cache entries derived from the file."""
+        return self._get_content_digest(os.path.abspath(filename))
+
+    def _get_directories(self):
+        if self._directory is not None:
+            yield self._directory
+        for directory in self._shared_directories:
+            yield directory
+
+    def _get_entry_name(self, filename, variant=None, digest=None):
+        # Different variants of data derived from the same file
+        # are stored under different keys.
+        if digest is None:
+            digest = self._get_content_digest(os.path.abspath(filename))
+        key = digest
+        if variant is not None:
+            key += '\0' + variant
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
 
-            # On Unix, this would just be os.rename() but Windows
-            # doesn't allow that.
-            shutil.move(tmp_filename, version)
+    def _promote(self, shared_filename, entry_name):
+        def copy(tmp_file):
+            with open(shared_filename, 'rb') as shared_file:
+                shutil.copyfileobj(shared_file, tmp_file)
+
+        if _write_file(os.path.join(self._directory, entry_name),
+                       copy, 'wb'):
+            self._enforce_max_size()
+
+    def _enforce_max_size(self):
+        if self._max_size is not None:
+            self.prune(self._max_size)
+
+    def _list_files(self):
+        # The entries and the records of file digests, which all count
+        # towards the size of the cache directory
+        files = []
+        for name in os.listdir(self._directory):
+            if name.startswith('.'):
+                continue
+            filename = os.path.join(self._directory, name)
+            try:
+                st = os.stat(filename)
+            except (IOError, OSError) as e:
+                # Removed by another process
+                if e.errno == errno.ENOENT:
+                    continue
+                else:
+                    raise
+            files.append((filename, st))
+        return files
+
+    def _touch(self, entry_filename):
+        # The modification time of an entry tracks its last use
+        # for the least recently used eviction.
+        try:
+            os.utime(entry_filename, None)
         except (IOError, OSError) as e:
-            # Permission denied
-            if e.errno == errno.EACCES:
+            if e.errno in (errno.EACCES, errno.EPERM, errno.ENOENT):
                 return
             else:
                 raise
 
-    def _get_filename(self, filename):
-        # If we couldn't create the directory we're probably
-        # on a read only home directory where we just disable
-        # the cache all together.
+    def _update_stats(self, **increments):
         if self._directory is None:
             return
-        # Assume UTF-8 encoding for the filenames. This doesn't matter so much
-        # as long as the results of this method always produce the same hash.
-        hexdigest = hashlib.sha1(filename.encode('utf-8')).hexdigest()
-        return os.path.join(self._directory, hexdigest)
+        pending = _get_pending_stats()
+        _add_stats(pending.setdefault(self._directory, {}), increments)
 
-    def _cache_is_valid(self, store_filename, filename):
-        return (os.stat(store_filename).st_mtime >=
-                os.stat(filename).st_mtime)
+    def get_stats(self):
+        """Return a dictionary of statistics on the user cache directory:
+'directory', the number of 'entries', 'size' in bytes of the entries and
+the records of file digests, the numbers of 'hits' and 'misses',
+and 'time_saved' in seconds.  Returns None if the cache is disabled."""
+        if self._directory is None:
+            return None
+        files = self._list_files()
+        stats = _read_stats(self._directory)
+        _add_stats(stats, _get_pending_stats().get(self._directory, {}))
+        return {'directory': self._directory,
+                'entries': sum(1 for filename, _ in files
+                               if _is_entry_name(os.path.basename(filename))),
+                'size': sum(st.st_size for _, st in files),
+                'hits': stats.get('hits', 0),
+                'misses': stats.get('misses', 0),
+                'time_saved': stats.get('time_saved', 0.0)}
 
-    def _remove_filename(self, filename):
-        try:
-            os.unlink(filename)
-        except (IOError, OSError) as e:
-            # Ignore "permission denied", "file does not exist"
-            if e.errno in (errno.EACCES, errno.ENOENT):
-                return
-            else:
-                raise
+    def prune(self, max_size):
+        """Evict the least recently used entries and records of file
+digests from the user cache directory until their total size does not
+exceed max_size bytes.  Returns a tuple of the number of evicted files
+and the number of bytes freed."""
+        if self._directory is None:
+            return 0, 0
+        evicted = 0
+        freed = 0
+        with _locked(self._directory):
+            files = self._list_files()
+            total_size = sum(st.st_size for _, st in files)
+            files.sort(key=lambda item: item[1].st_mtime)
+            for filename, st in files:
+                if total_size - freed <= max_size:
+                    break
+                _remove_filename(filename)
+                evicted += 1
+                freed += st.st_size
+        return evicted, freed
 
-    def _clean(self):
-        for filename in os.listdir(self._directory):
-            if filename == _CACHE_VERSION_FILENAME:
-                continue
-            self._remove_filename(os.path.join(self._directory, filename))
+    def store(self, filename, data, variant=None, cost=None, replace=False,
+              persistent_id=None):
+        """Store data derived from a file.  The cost is the time in seconds
+it took to compute the data, used to account for the time saved by
+the cache.  An existing entry is only overwritten if replace is true.
+The persistent_id function, if given, is set on the pickler to store
+references to objects kept elsewhere; the entry is then loaded with
+a matching persistent_load function.  Raises pickle.PicklingError if
+the data cannot be pickled; no entry is stored then."""
+        self._store(filename, variant, cost,
+                    lambda f: _dump_pickle(data, f, persistent_id),
+                    replace)
+
+    def store_bytes(self, filename, data, variant=None, cost=None):
+        """Like store(), but the data is a byte string that is stored
+as is, to be loaded with load_mapped()."""
+        self._store(filename, variant, cost, lambda f: f.write(data))
 
-    def store(self, filename, data):
-        store_filename = self._get_filename(filename)
-        if store_filename is None:
+    def _store(self, filename, variant, cost, write_data, replace=False):
+        # If we couldn't create the directory we're probably
+        # on a read only home directory where we just disable
+        # the cache all together.
+        if self._directory is None:
             return
 
-        if (os.path.exists(store_filename) and self._cache_is_valid(store_filename, filename)):
+        store_filename = os.path.join(self._directory,
+                                      self._get_entry_name(filename, variant))
+        if not replace and os.path.exists(store_filename):
             return None
 
-        tmp_fd, tmp_filename = tempfile.mkstemp(prefix='grust-gen-cache-')
-        try:
-            with os.fdopen(tmp_fd, 'wb') as tmp_file:
-                pickle.dump(data, tmp_file)
-        except (IOError, OSError) as e:
-            # No space left on device
-            if e.errno == errno.ENOSPC:
-                self._remove_filename(tmp_filename)
-                return
-            else:
-                raise
+        def write_entry(tmp_file):
+            # Protocol 2 or later is needed for the slotted AST classes
+            pickle.dump(self._version_tag, tmp_file, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(cost or 0.0, tmp_file, pickle.HIGHEST_PROTOCOL)
+            write_data(tmp_file)
 
-        try:
-            shutil.move(tmp_filename, store_filename)
-        except (IOError, OSError) as e:
-            # Permission denied
-            if e.errno == errno.EACCES:
-                self._remove_filename(tmp_filename)
-            else:
-                raise
+        if _write_file(store_filename, write_entry, 'wb'):
+            self._enforce_max_size()
+
+    def load(self, filename, variant=None, persistent_load=None):
+        """Load data stored with store(), or return None if there is no
+valid entry for the current contents of the file.  An entry is taken
+as invalid if the persistent_load function raises UnpicklingError."""
+        return self._load(filename, variant,
+                          lambda fd: _load_pickle(fd, persistent_load))
 
-    def load(self, filename):
-        store_filename = self._get_filename(filename)
-        if store_filename is None:
+    def load_mapped(self, filename, variant=None):
+        """Load data stored with store_bytes() as a read-only memory map
+of the entry file.  Returns a tuple of the mmap object and the offset
+of the data in it, or None if there is no valid entry."""
+        return self._load(filename, variant, _map_file)
+
+    def load_mapped_by_digest(self, digest, variant=None):
+        """Like load_mapped(), but look up the entry by the digest of
+the file contents, as returned by get_digest(), rather than by the file.
+This finds the entry for the contents the file had when the digest
+was taken, even if the file has changed or is gone since."""
+        return self._load(None, variant, _map_file, digest)
+
+    def _load(self, filename, variant, read_data, digest=None):
+        if self._directory is None and not self._shared_directories:
             return
-        try:
-            fd = open(store_filename, 'rb')
-        except (IOError, OSError) as e:
-            if e.errno == errno.ENOENT:
-                return None
-            else:
-                raise
-        if not self._cache_is_valid(store_filename, filename):
-            return None
-        try:
-            data = pickle.load(fd)
-        except (AttributeError, EOFError, ValueError, pickle.BadPickleGet):
-            # Broken cache entry, remove it
-            self._remove_filename(store_filename)
-            data = None
-        return data
+        start_time = time.time()
+        entry_name = self._get_entry_name(filename, variant, digest)
+        for directory in self._get_directories():
+            store_filename = os.path.join(directory, entry_name)
+            try:
+                fd = open(store_filename, 'rb')
+            except (IOError, OSError) as e:
+                if e.errno == errno.ENOENT:
+                    continue
+                else:
+                    raise
+            try:
+                if pickle.load(fd) == self._version_tag:
+                    cost = pickle.load(fd)
+                    data = read_data(fd)
+                else:
+                    data = None
+            except (AttributeError, EOFError, ImportError, ValueError,
+                    pickle.UnpicklingError):
+                data = None
+            finally:
+                fd.close()
+            if data is None:
+                # Broken or stale cache entry; remove it if it's ours
+                if directory == self._directory:
+                    _remove_filename(store_filename)
+                continue
+            if directory == self._directory:
+                self._touch(store_filename)
+            elif self._directory is not None:
+                self._promote(store_filename, entry_name)
+            load_time = time.time() - start_time
+            self._update_stats(hits=1, time_saved=max(cost - load_time, 0.0))
+            return data
+        self._update_stats(misses=1)
+        return None
@@ -23,5 +23,14 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import sys
+
 from .counter import Counter
-from .ordereddict import OrderedDict
+
+if sys.version_info >= (3, 7):
+    # The built-in dict keeps the insertion order as a language guarantee,
+    # and is faster to populate, to delete from and to unpickle
+    # than the pure-Python implementation.
+    OrderedDict = dict
+else:
+    from .ordereddict import OrderedDict
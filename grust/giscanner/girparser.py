@@ -25,7 +25,12 @@ from __future__ import unicode_literals
 
 import os
 
-from xml.etree.cElementTree import parse
+try:
+    from xml.etree.cElementTree import (iterparse, ParseError, TreeBuilder,
+                                        XMLParser)
+except ImportError:
+    from xml.etree.ElementTree import (iterparse, ParseError, TreeBuilder,
+                                       XMLParser)
 
 from . import ast
 
@@ -52,48 +57,193 @@ def _cns(tag):
     return '{%s}%s' % (C_NS, tag)
 
 
+# Toplevel namespace elements that are parsed in the types-only mode
+_TYPE_DECL_TAGS = frozenset([
+    _corens('alias'),
+    _corens('bitfield'),
+    _corens('callback'),
+    _corens('class'),
+    _corens('enumeration'),
+    _corens('interface'),
+    _corens('record'),
+    _corens('union'),
+    _glibns('boxed')])
+
+# Type declarations whose contents are needed in the types-only mode;
+# for the rest, only the attributes of the toplevel element are used.
+_TYPE_DECL_WITH_CONTENT_TAGS = frozenset([
+    _corens('alias'),
+    _corens('callback')])
+
+# Elements holding documentation and source information, which are
+# only read when the documentation is loaded
+_DOC_TAGS = frozenset([
+    _corens('doc'),
+    _corens('doc-version'),
+    _corens('doc-deprecated'),
+    _corens('doc-stability'),
+    _corens('source-position')])
+
+_ANNOTATION_TAGS = _DOC_TAGS | frozenset([_corens('attribute')])
+
+# Child elements giving the type of a typed node, in order of precedence
+_TYPE_TAGS = (
+    _corens('callback'),
+    _corens('array'),
+    _corens('varargs'),
+    _corens('type'))
+
+_FILTER_CHUNK_SIZE = 64 * 1024
+
+
+def _skip_for_types_only(path, tag):
+    depth = len(path)
+    if depth < 2:
+        return False
+    if depth == 2:
+        return tag not in _TYPE_DECL_TAGS
+    if path[2] not in _TYPE_DECL_WITH_CONTENT_TAGS:
+        return True
+    return tag in _ANNOTATION_TAGS
+
+
+def _skip_docs(path, tag):
+    return tag in _DOC_TAGS
+
+
+class _FilteringTreeBuilder(object):
+    """A parser target building only the parts of the GIR document
+that are needed in the current parsing mode.
+
+The skip function is called with the list of tags of the currently
+open elements and the tag of a newly started element, and returns
+True if the element should be dropped together with its subtree.
+Elements in the skipped subtrees are dropped as soon as the XML parser
+reports them, without creating any element objects.  The start and end
+events for the retained elements are appended to the given list,
+in the same form as produced by iterparse()."""
+
+    def __init__(self, events, skip_func):
+        self._builder = TreeBuilder()
+        self._events = events
+        self._skips = skip_func
+        self._path = []
+        self._skip_depth = 0
+
+    def start(self, tag, attrib):
+        if self._skip_depth:
+            self._skip_depth += 1
+        elif self._skips(self._path, tag):
+            self._skip_depth = 1
+        else:
+            self._path.append(tag)
+            elem = self._builder.start(tag, attrib)
+            self._events.append(('start', elem))
+
+    def end(self, tag):
+        if self._skip_depth:
+            self._skip_depth -= 1
+        else:
+            self._path.pop()
+            elem = self._builder.end(tag)
+            self._events.append(('end', elem))
+
+    def data(self, data):
+        if not self._skip_depth:
+            self._builder.data(data)
+
+    def close(self):
+        return self._builder.close()
+
+
+def _filtered_iterparse(filename, skip_func):
+    events = []
+    parser = XMLParser(target=_FilteringTreeBuilder(events, skip_func))
+    with open(filename, 'rb') as source:
+        while True:
+            data = source.read(_FILTER_CHUNK_SIZE)
+            if not data:
+                break
+            parser.feed(data)
+            for event in events:
+                yield event
+            del events[:]
+    parser.close()
+    for event in events:
+        yield event
+
+
 class GIRParser(object):
 
-    def __init__(self, types_only=False):
+    def __init__(self, types_only=False, with_docs=True):
         self._types_only = types_only
+        self._with_docs = with_docs
         self._namespace = None
         self._filename_stack = []
 
+    @classmethod
+    def from_namespace(cls, namespace, types_only=False, with_docs=True):
+        """Create a parser for a namespace that has been parsed before,
+such as one loaded from the cache."""
+        self = cls(types_only=types_only, with_docs=with_docs)
+        self._namespace = namespace
+        return self
+
     # Public API
 
     def parse(self, filename):
         filename = os.path.abspath(filename)
         self._filename_stack.append(filename)
-        tree = parse(filename)
-        self.parse_tree(tree)
+        self._parse_incremental(filename)
         self._filename_stack.pop()
 
     def parse_tree(self, tree):
-        self._namespace = None
-        self._pkgconfig_packages = set()
-        self._includes = set()
-        self._c_includes = set()
-        self._c_prefix = None
+        self._init_api()
         self._parse_api(tree.getroot())
 
     def get_namespace(self):
         return self._namespace
 
+    def is_types_only(self):
+        return self._types_only
+
+    def has_docs(self):
+        return self._with_docs and not self._types_only
+
     # Private
 
     def _find_first_child(self, node, name_or_names):
         if isinstance(name_or_names, str):
-            for child in node.getchildren():
+            for child in node:
                 if child.tag == name_or_names:
                     return child
         else:
-            for child in node.getchildren():
+            for child in node:
                 if child.tag in name_or_names:
                     return child
         return None
 
     def _find_children(self, node, name):
-        return [child for child in node.getchildren() if child.tag == name]
+        return [child for child in node if child.tag == name]
+
+    def _index_children(self, node):
+        # Bucket the children by tag in one pass over the element,
+        # so that the parse methods do not need to rescan it for
+        # each kind of child they look for.
+        children = {}
+        for child in node:
+            tag = child.tag
+            if tag in children:
+                children[tag].append(child)
+            else:
+                children[tag] = [child]
+        return children
+
+    def _first_indexed(self, children, name):
+        nodes = children.get(name)
+        if nodes:
+            return nodes[0]
+        return None
 
     def _get_current_file(self):
         if not self._filename_stack:
@@ -104,23 +254,79 @@ class GIRParser(object):
             return curfile[len(cwd):]
         return curfile
 
-    def _parse_api(self, root):
+    def _init_api(self):
+        self._namespace = None
+        self._pkgconfig_packages = set()
+        self._includes = set()
+        self._c_includes = set()
+        self._c_prefix = None
+
+    def _parse_incremental(self, filename):
+        # Walk the document in a single pass, building AST nodes as soon
+        # as each toplevel element is complete and discarding the element
+        # afterwards, so that the whole tree is never held in memory.
+        # In the types-only mode or without documentation, the elements
+        # that would be ignored are not built in the first place.
+        self._init_api()
+        if self._types_only:
+            events = _filtered_iterparse(filename, _skip_for_types_only)
+        elif not self._with_docs:
+            events = _filtered_iterparse(filename, _skip_docs)
+        else:
+            events = iterparse(filename, events=('start', 'end'))
+        depth = 0
+        root = None
+        section = None
+        for event, elem in events:
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                    self._check_repository(root)
+                elif depth == 2:
+                    section = elem
+                    if elem.tag == _corens('namespace'):
+                        self._parse_namespace_attribs(elem)
+                continue
+            if depth == 3 and section.tag == _corens('namespace'):
+                self._parse_namespace_child(elem)
+                section.remove(elem)
+            elif depth == 2:
+                if elem.tag != _corens('namespace'):
+                    self._parse_repository_child(elem)
+                root.remove(elem)
+            depth -= 1
+        assert self._namespace is not None
+
+    def _check_repository(self, root):
         assert root.tag == _corens('repository')
         version = root.attrib['version']
         if version != COMPATIBLE_GIR_VERSION:
             raise SystemExit("%s: Incompatible version %s (supported: %s)" %
                              (self._get_current_file(), version, COMPATIBLE_GIR_VERSION))
 
-        for node in root.getchildren():
-            if node.tag == _corens('include'):
-                self._parse_include(node)
-            elif node.tag == _corens('package'):
-                self._parse_pkgconfig_package(node)
-            elif node.tag == _cns('include'):
-                self._parse_c_include(node)
+    def _parse_api(self, root):
+        self._check_repository(root)
+
+        for node in root:
+            self._parse_repository_child(node)
 
         ns = root.find(_corens('namespace'))
         assert ns is not None
+        self._parse_namespace_attribs(ns)
+
+        for node in ns:
+            self._parse_namespace_child(node)
+
+    def _parse_repository_child(self, node):
+        if node.tag == _corens('include'):
+            self._parse_include(node)
+        elif node.tag == _corens('package'):
+            self._parse_pkgconfig_package(node)
+        elif node.tag == _cns('include'):
+            self._parse_c_include(node)
+
+    def _parse_namespace_attribs(self, ns):
         identifier_prefixes = ns.attrib.get(_cns('identifier-prefixes'))
         if identifier_prefixes:
             identifier_prefixes = identifier_prefixes.split(',')
@@ -137,7 +343,7 @@ class GIRParser(object):
         self._namespace.c_includes = self._c_includes
         self._namespace.exported_packages = self._pkgconfig_packages
 
-        parser_methods = {
+        self._parser_methods = {
             _corens('alias'): self._parse_alias,
             _corens('bitfield'): self._parse_enumeration_bitfield,
             _corens('callback'): self._parse_callback,
@@ -149,13 +355,13 @@ class GIRParser(object):
             _glibns('boxed'): self._parse_boxed}
 
         if not self._types_only:
-            parser_methods[_corens('constant')] = self._parse_constant
-            parser_methods[_corens('function')] = self._parse_function
+            self._parser_methods[_corens('constant')] = self._parse_constant
+            self._parser_methods[_corens('function')] = self._parse_function
 
-        for node in ns.getchildren():
-            method = parser_methods.get(node.tag)
-            if method is not None:
-                method(node)
+    def _parse_namespace_child(self, node):
+        method = self._parser_methods.get(node.tag)
+        if method is not None:
+            method(node)
 
     def _parse_include(self, node):
         include = ast.Include(node.attrib['name'], node.attrib['version'])
@@ -168,12 +374,13 @@ class GIRParser(object):
         self._c_includes.add(node.attrib['name'])
 
     def _parse_alias(self, node):
-        typeval = self._parse_type(node)
+        children = self._index_children(node)
+        typeval = self._parse_type(node, children)
         alias = ast.Alias(node.attrib['name'], typeval, node.attrib.get(_cns('type')))
-        self._parse_generic_attribs(node, alias)
+        self._parse_generic_attribs(node, alias, children)
         self._namespace.append(alias)
 
-    def _parse_generic_attribs(self, node, obj):
+    def _parse_generic_attribs(self, node, obj, children=None):
         assert isinstance(obj, ast.Annotated)
         skip = node.attrib.get('skip')
         if skip:
@@ -189,32 +396,34 @@ class GIRParser(object):
                 obj.introspectable = False
         if self._types_only:
             return
-        doc = node.find(_corens('doc'))
+        if children is None:
+            children = self._index_children(node)
+        doc = self._first_indexed(children, _corens('doc'))
         if doc is not None:
             if doc.text:
                 obj.doc = doc.text
         version = node.attrib.get('version')
         if version:
             obj.version = version
-        version_doc = node.find(_corens('doc-version'))
+        version_doc = self._first_indexed(children, _corens('doc-version'))
         if version_doc is not None:
             if version_doc.text:
                 obj.version_doc = version_doc.text
         deprecated = node.attrib.get('deprecated-version')
         if deprecated:
             obj.deprecated = deprecated
-        deprecated_doc = node.find(_corens('doc-deprecated'))
+        deprecated_doc = self._first_indexed(children, _corens('doc-deprecated'))
         if deprecated_doc is not None:
             if deprecated_doc.text:
                 obj.deprecated_doc = deprecated_doc.text
         stability = node.attrib.get('stability')
         if stability:
             obj.stability = stability
-        stability_doc = node.find(_corens('doc-stability'))
+        stability_doc = self._first_indexed(children, _corens('doc-stability'))
         if stability_doc is not None:
             if stability_doc.text:
                 obj.stability_doc = stability_doc.text
-        attributes = node.findall(_corens('attribute'))
+        attributes = children.get(_corens('attribute'))
         if attributes:
             attributes_ = OrderedDict()
             for attribute in attributes:
@@ -247,7 +456,11 @@ class GIRParser(object):
             raise AssertionError(node)
 
         obj = klass(**ctor_kwargs)
-        self._parse_generic_attribs(node, obj)
+        if self._types_only:
+            children = None
+        else:
+            children = self._index_children(node)
+        self._parse_generic_attribs(node, obj, children)
         type_struct = node.attrib.get(_glibns('type-struct'))
         if type_struct:
             obj.glib_type_struct = self._namespace.type_from_name(type_struct)
@@ -258,37 +471,37 @@ class GIRParser(object):
             for func_id in ['ref-func', 'unref-func',
                             'set-value-func', 'get-value-func']:
                 func_name = node.attrib.get(_glibns(func_id))
-                obj.__dict__[func_id.replace('-', '_')] = func_name
+                setattr(obj, func_id.replace('-', '_'), func_name)
 
         if self._types_only:
             self._namespace.append(obj)
             return
 
-        for iface in self._find_children(node, _corens('implements')):
+        for iface in children.get(_corens('implements'), ()):
             obj.interfaces.append(self._namespace.type_from_name(iface.attrib['name']))
-        for iface in self._find_children(node, _corens('prerequisite')):
+        for iface in children.get(_corens('prerequisite'), ()):
             obj.prerequisites.append(self._namespace.type_from_name(iface.attrib['name']))
-        for func_node in self._find_children(node, _corens('function')):
+        for func_node in children.get(_corens('function'), ()):
             func = self._parse_function_common(func_node, ast.Function, obj)
             obj.static_methods.append(func)
-        for method in self._find_children(node, _corens('method')):
+        for method in children.get(_corens('method'), ()):
             func = self._parse_function_common(method, ast.Function, obj)
             func.is_method = True
             obj.methods.append(func)
-        for method in self._find_children(node, _corens('virtual-method')):
+        for method in children.get(_corens('virtual-method'), ()):
             func = self._parse_function_common(method, ast.VFunction, obj)
             self._parse_generic_attribs(method, func)
             func.is_method = True
             func.invoker = method.get('invoker')
             obj.virtual_methods.append(func)
-        for ctor in self._find_children(node, _corens('constructor')):
+        for ctor in children.get(_corens('constructor'), ()):
             func = self._parse_function_common(ctor, ast.Function, obj)
             func.is_constructor = True
             obj.constructors.append(func)
         obj.fields.extend(self._parse_fields(node, obj))
-        for prop in self._find_children(node, _corens('property')):
+        for prop in children.get(_corens('property'), ()):
             obj.properties.append(self._parse_property(prop, obj))
-        for signal in self._find_children(node, _glibns('signal')):
+        for signal in children.get(_glibns('signal'), ()):
             obj.signals.append(self._parse_function_common(signal, ast.Signal, obj))
 
         self._namespace.append(obj)
@@ -302,7 +515,8 @@ class GIRParser(object):
         self._namespace.append(function)
 
     def _parse_parameter(self, node):
-        typeval = self._parse_type(node)
+        children = self._index_children(node)
+        typeval = self._parse_type(node, children)
         param = ast.Parameter(node.attrib.get('name'),
                               typeval,
                               node.attrib.get('direction') or ast.PARAM_DIRECTION_IN,
@@ -312,18 +526,21 @@ class GIRParser(object):
                               node.attrib.get('allow-none') == '1',
                               node.attrib.get('scope'),
                               node.attrib.get('caller-allocates') == '1')
-        self._parse_generic_attribs(node, param)
+        self._parse_generic_attribs(node, param, children)
         return param
 
     def _parse_function_common(self, node, klass, parent=None):
         name = node.attrib['name']
-        returnnode = node.find(_corens('return-value'))
-        if not returnnode:
+        children = self._index_children(node)
+        returnnode = self._first_indexed(children, _corens('return-value'))
+        if returnnode is None:
             raise ValueError('node %r has no return-value' % (name, ))
+        return_children = self._index_children(returnnode)
         transfer = returnnode.attrib.get('transfer-ownership')
         nullable = returnnode.attrib.get('nullable') == '1'
-        retval = ast.Return(self._parse_type(returnnode), nullable, False, transfer)
-        self._parse_generic_attribs(returnnode, retval)
+        retval = ast.Return(self._parse_type(returnnode, return_children),
+                            nullable, False, transfer)
+        self._parse_generic_attribs(returnnode, retval, return_children)
         parameters = []
 
         throws = (node.attrib.get('throws') == '1')
@@ -351,15 +568,16 @@ class GIRParser(object):
         func.moved_to = node.attrib.get('moved-to', None)
         func.parent = parent
 
-        parameters_node = node.find(_corens('parameters'))
+        parameters_node = self._first_indexed(children, _corens('parameters'))
         if (parameters_node is not None):
-            paramnode = self._find_first_child(parameters_node, _corens('instance-parameter'))
-            if paramnode:
+            param_children = self._index_children(parameters_node)
+            paramnode = self._first_indexed(param_children, _corens('instance-parameter'))
+            if paramnode is not None:
                 func.instance_parameter = self._parse_parameter(paramnode)
-            for paramnode in self._find_children(parameters_node, _corens('parameter')):
+            paramnodes = param_children.get(_corens('parameter'), ())
+            for paramnode in paramnodes:
                 parameters.append(self._parse_parameter(paramnode))
-            for i, paramnode in enumerate(self._find_children(parameters_node,
-                                                              _corens('parameter'))):
+            for i, paramnode in enumerate(paramnodes):
                 param = parameters[i]
                 self._parse_type_array_length(parameters, paramnode, param.type)
                 closure = paramnode.attrib.get('closure')
@@ -373,12 +591,13 @@ class GIRParser(object):
                     assert idx < len(parameters), "%d >= %d" % (idx, len(parameters))
                     param.destroy_name = parameters[idx].argname
 
-        self._parse_type_array_length(parameters, returnnode, retval.type)
+        self._parse_type_array_length(parameters, returnnode, retval.type,
+                                      return_children)
 
         # Re-set the function's parameters to notify it of changes to the list.
         func.parameters = parameters
 
-        self._parse_generic_attribs(node, func)
+        self._parse_generic_attribs(node, func, children)
 
         self._namespace.track(func)
         return func
@@ -386,7 +605,7 @@ class GIRParser(object):
     def _parse_fields(self, node, obj):
         res = []
         names = (_corens('field'), _corens('record'), _corens('union'), _corens('callback'))
-        for child in node.getchildren():
+        for child in node:
             if child.tag in names:
                 fieldobj = self._parse_field(child, obj)
                 res.append(fieldobj)
@@ -401,20 +620,23 @@ class GIRParser(object):
                        c_symbol_prefix=node.attrib.get(_cns('symbol-prefix')))
         if node.attrib.get('foreign') == '1':
             compound.foreign = True
-        self._parse_generic_attribs(node, compound)
-        if not self._types_only:
+        if self._types_only:
+            self._parse_generic_attribs(node, compound)
+        else:
+            children = self._index_children(node)
+            self._parse_generic_attribs(node, compound, children)
             compound.fields.extend(self._parse_fields(node, compound))
-            for method in self._find_children(node, _corens('method')):
+            for method in children.get(_corens('method'), ()):
                 func = self._parse_function_common(method, ast.Function, compound)
                 func.is_method = True
                 compound.methods.append(func)
-            for i, fieldnode in enumerate(self._find_children(node, _corens('field'))):
+            for i, fieldnode in enumerate(children.get(_corens('field'), ())):
                 field = compound.fields[i]
                 self._parse_type_array_length(compound.fields, fieldnode, field.type)
-            for func in self._find_children(node, _corens('function')):
+            for func in children.get(_corens('function'), ()):
                 compound.static_methods.append(
                     self._parse_function_common(func, ast.Function, compound))
-            for ctor in self._find_children(node, _corens('constructor')):
+            for ctor in children.get(_corens('constructor'), ()):
                 func = self._parse_function_common(ctor, ast.Function, compound)
                 func.is_constructor = True
                 compound.constructors.append(func)
@@ -438,9 +660,8 @@ class GIRParser(object):
     def _parse_type_simple(self, typenode):
         # ast.Fields can contain inline callbacks
         if typenode.tag == _corens('callback'):
-            typeval = self._namespace.type_from_name(typenode.attrib['name'])
-            typeval.ctype = typenode.attrib.get(_cns('type'))
-            return typeval
+            return self._namespace.type_from_name(typenode.attrib['name'],
+                                                  typenode.attrib.get(_cns('type')))
         # ast.Arrays have their own toplevel XML
         elif typenode.tag == _corens('array'):
             array_type = typenode.attrib.get('name')
@@ -485,17 +706,22 @@ class GIRParser(object):
         else:
             assert False, "Failed to parse inner type"
 
-    def _parse_type(self, node):
-        for name in map(_corens, ('callback', 'array', 'varargs', 'type')):
-            typenode = node.find(name)
+    def _parse_type(self, node, children=None):
+        if children is None:
+            children = self._index_children(node)
+        for name in _TYPE_TAGS:
+            typenode = self._first_indexed(children, name)
             if typenode is not None:
                 return self._parse_type_simple(typenode)
         assert False, "Failed to parse toplevel type"
 
-    def _parse_type_array_length(self, siblings, node, typeval):
+    def _parse_type_array_length(self, siblings, node, typeval, children=None):
         """A hack necessary to handle the integer parameter/field indexes on
            array types."""
-        typenode = node.find(_corens('array'))
+        if children is None:
+            typenode = node.find(_corens('array'))
+        else:
+            typenode = self._first_indexed(children, _corens('array'))
         if typenode is None:
             return
         lenidx = typenode.attrib.get('length')
@@ -518,14 +744,15 @@ class GIRParser(object):
             self._namespace.append(obj)
             return
 
-        for method in self._find_children(node, _corens('method')):
+        children = self._index_children(node)
+        for method in children.get(_corens('method'), ()):
             func = self._parse_function_common(method, ast.Function, obj)
             func.is_method = True
             obj.methods.append(func)
-        for ctor in self._find_children(node, _corens('constructor')):
+        for ctor in children.get(_corens('constructor'), ()):
             obj.constructors.append(
                 self._parse_function_common(ctor, ast.Function, obj))
-        for callback in self._find_children(node, _corens('callback')):
+        for callback in children.get(_corens('callback'), ()):
             obj.fields.append(
                 self._parse_function_common(callback, ast.Callback, obj))
         self._namespace.append(obj)
@@ -548,7 +775,8 @@ class GIRParser(object):
                 assert False, anonymous_elt.tag
         else:
             assert node.tag == _corens('field'), node.tag
-            type_node = self._parse_type(node)
+            children = self._index_children(node)
+            type_node = self._parse_type(node, children)
         field = ast.Field(node.attrib.get('name'),
                           type_node,
                           node.attrib.get('readable') != '0',
@@ -561,14 +789,15 @@ class GIRParser(object):
         return field
 
     def _parse_property(self, node, parent):
+        children = self._index_children(node)
         prop = ast.Property(node.attrib['name'],
-                            self._parse_type(node),
+                            self._parse_type(node, children),
                             node.attrib.get('readable') != '0',
                             node.attrib.get('writable') == '1',
                             node.attrib.get('construct') == '1',
                             node.attrib.get('construct-only') == '1',
                             node.attrib.get('transfer-ownership'))
-        self._parse_generic_attribs(node, prop)
+        self._parse_generic_attribs(node, prop, children)
         prop.parent = parent
         return prop
 
@@ -581,12 +810,13 @@ class GIRParser(object):
         return member
 
     def _parse_constant(self, node):
-        type_node = self._parse_type(node)
+        children = self._index_children(node)
+        type_node = self._parse_type(node, children)
         constant = ast.Constant(node.attrib['name'],
                                 type_node,
                                 node.attrib['value'],
                                 node.attrib.get(_cns('type')))
-        self._parse_generic_attribs(node, constant)
+        self._parse_generic_attribs(node, constant, children)
         self._namespace.append(constant)
 
     def _parse_enumeration_bitfield(self, node):
@@ -606,17 +836,18 @@ class GIRParser(object):
                     get_type=get_type)
         obj.error_domain = glib_error_domain
         obj.ctype = ctype
-        self._parse_generic_attribs(node, obj)
-
         if self._types_only:
+            self._parse_generic_attribs(node, obj)
             self._namespace.append(obj)
             return
 
-        for member_node in self._find_children(node, _corens('member')):
+        children = self._index_children(node)
+        self._parse_generic_attribs(node, obj, children)
+        for member_node in children.get(_corens('member'), ()):
             member = self._parse_member(member_node)
             member.parent = obj
             members.append(member)
-        for func_node in self._find_children(node, _corens('function')):
+        for func_node in children.get(_corens('function'), ()):
             func = self._parse_function_common(func_node, ast.Function)
             func.parent = obj
             obj.static_methods.append(func)
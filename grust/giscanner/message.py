@@ -106,6 +106,7 @@ class MessageLogger(object):
         self._enable_warnings = []
         self._warning_count = 0
         self._error_count = 0
+        self._recorded = None
 
     @classmethod
     def get(cls, *args, **kwargs):
@@ -122,6 +123,27 @@ class MessageLogger(object):
     def get_error_count(self):
         return self._error_count
 
+    def start_recording(self):
+        """
+        Start keeping a copy of the text of the messages written
+        to the output.
+        """
+        self._recorded = []
+
+    def stop_recording(self):
+        """
+        Stop keeping the messages, and return the text of the messages
+        written since start_recording() was called.
+        """
+        recorded = self._recorded or []
+        self._recorded = None
+        return ''.join(recorded)
+
+    def _write(self, text):
+        self._output.write(text)
+        if self._recorded is not None:
+            self._recorded.append(text)
+
     def log(self, log_type, text, positions=None, prefix=None, marker_pos=None, marker_line=None):
         """
         Log a warning, using optional file positioning information.
@@ -143,7 +165,7 @@ class MessageLogger(object):
             positions = [Position('<unknown>')]
 
         for position in positions[:-1]:
-            self._output.write("%s:\n" % (position.format(cwd=self._cwd), ))
+            self._write("%s:\n" % (position.format(cwd=self._cwd), ))
         last_position = positions[-1].format(cwd=self._cwd)
 
         if log_type == WARNING:
@@ -171,7 +193,7 @@ class MessageLogger(object):
             else:
                 text = ('%s: %s: %s\n' % (last_position, error_type, text))
 
-        self._output.write(text)
+        self._write(text)
 
         if log_type == FATAL:
             utils.break_on_debug_flag('fatal')
@@ -0,0 +1,213 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""Indexed serialization of namespaces for lazy loading.
+
+:func:`encode_namespace` pickles each toplevel node of a namespace
+separately, and appends tables locating the nodes by name, C type
+and GType name. :class:`IndexedNamespace` reads the tables from a buffer,
+such as a memory map of a cache entry, and unpickles the nodes only as
+they are looked up. This makes an included namespace cheap to load
+when only a few of its types are referred to. A namespace loaded from
+a cache entry is pickled as a reference to the entry.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import struct
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from .collections import OrderedDict
+
+# The data starts with the offset of the tables, which follow the nodes
+_HEADER = struct.Struct(str('<Q'))
+
+_NAMESPACE_ATTRS = ('name', 'version',
+                    'identifier_prefixes', 'symbol_prefixes',
+                    '_ucase_symbol_prefixes',
+                    'includes', 'shared_libraries', 'c_includes',
+                    'exported_packages')
+
+# Persistent ID standing for the namespace in the pickled nodes
+_NAMESPACE_PID = 'namespace'
+
+
+def _dump_node(out, node, namespace):
+    pickler = pickle.Pickler(out, pickle.HIGHEST_PROTOCOL)
+    pickler.persistent_id = (
+            lambda obj: _NAMESPACE_PID if obj is namespace else None)
+    pickler.dump(node)
+
+
+def _load_node(data, namespace):
+    def persistent_load(pid):
+        if pid != _NAMESPACE_PID:
+            raise pickle.UnpicklingError(
+                    'unexpected persistent ID %r' % (pid, ))
+        return namespace
+
+    unpickler = pickle.Unpickler(io.BytesIO(data))
+    unpickler.persistent_load = persistent_load
+    return unpickler.load()
+
+
+def encode_namespace(namespace):
+    """Serialize an ast.Namespace into a byte string in the format
+read by IndexedNamespace."""
+    out = io.BytesIO()
+    out.write(_HEADER.pack(0))
+    spans = []
+    node_names = {}
+    for name, node in namespace.items():
+        start = out.tell()
+        _dump_node(out, node, namespace)
+        spans.append((name, (start, out.tell())))
+        node_names[id(node)] = name
+
+    def index(nodes):
+        return dict((key, node_names[id(node)])
+                    for key, node in nodes.items()
+                    if id(node) in node_names)
+
+    tables = {
+        'attrs': dict((attr, getattr(namespace, attr))
+                      for attr in _NAMESPACE_ATTRS),
+        'names': spans,
+        'aliases': index(namespace.aliases),
+        'ctypes': index(namespace.ctypes),
+        'type_names': index(namespace.type_names),
+    }
+    tables_offset = out.tell()
+    pickle.dump(tables, out, pickle.HIGHEST_PROTOCOL)
+    out.seek(0)
+    out.write(_HEADER.pack(tables_offset))
+    return out.getvalue()
+
+
+def _load_cached_namespace(digest, variant):
+    from .cachestore import CacheStore
+
+    mapped = CacheStore().load_mapped_by_digest(digest, variant)
+    if mapped is None:
+        # The object referring to the namespace cannot be restored;
+        # for a cache entry, this makes a miss
+        raise pickle.UnpicklingError(
+                'the cache entry of namespace data %s is gone' % (digest, ))
+    buf, offset = mapped
+    return IndexedNamespace(buf, offset, (digest, variant))
+
+
+class _NodeMapping(Mapping):
+    """A read-only mapping of keys to nodes decoded on demand."""
+
+    def __init__(self, namespace, node_names):
+        self._namespace = namespace
+        self._node_names = node_names
+
+    def __getitem__(self, key):
+        return self._namespace._get_node(self._node_names[key])
+
+    def __contains__(self, key):
+        return key in self._node_names
+
+    def __iter__(self):
+        return iter(self._node_names)
+
+    def __len__(self):
+        return len(self._node_names)
+
+
+class IndexedNamespace(object):
+    """A read-only namespace backed by data produced by encode_namespace().
+
+The lookup part of the ast.Namespace interface is provided: the
+namespace attributes, the mappings names, aliases, ctypes and
+type_names, and the methods get() and get_by_ctype().  The symbol
+table is not indexed.  Each node is unpickled the first time it is
+looked up, and the same node object is returned afterwards."""
+
+    def __init__(self, buf, offset=0, cache_key=None):
+        """Read the namespace from buf, which may be a byte string or
+a memory map, at the given offset.  If the data is a cache entry,
+cache_key is a tuple of the file digest and the variant it has been
+loaded with using CacheStore.load_mapped_by_digest()."""
+        self._buffer = buf
+        self._offset = offset
+        self._cache_key = cache_key
+        tables_offset, = _HEADER.unpack(buf[offset:offset + _HEADER.size])
+        tables = pickle.loads(buf[offset + tables_offset:])
+        for attr, value in tables['attrs'].items():
+            setattr(self, attr, value)
+        self._spans = OrderedDict(tables['names'])
+        self._nodes = {}
+        self.names = _NodeMapping(
+                self, OrderedDict((name, name) for name in self._spans))
+        self.aliases = _NodeMapping(self, tables['aliases'])
+        self.ctypes = _NodeMapping(self, tables['ctypes'])
+        self.type_names = _NodeMapping(self, tables['type_names'])
+
+    def __reduce__(self):
+        # A memory map cannot be pickled. Refer to the cache entry,
+        # so that an object holding the namespace is not weighed down
+        # with all of its data, and the nodes are still decoded lazily.
+        if self._cache_key is not None:
+            return (_load_cached_namespace, self._cache_key)
+        return (IndexedNamespace, (self._buffer[self._offset:], ))
+
+    def _get_node(self, name):
+        node = self._nodes.get(name)
+        if node is None:
+            start, end = self._spans[name]
+            base = self._offset
+            node = _load_node(self._buffer[base + start:base + end], self)
+            self._nodes[name] = node
+        return node
+
+    def load_all(self):
+        """Unpickle all nodes that have not been looked up yet."""
+        for name in self._spans:
+            self._get_node(name)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def items(self):
+        return self.names.items()
+
+    def values(self):
+        return self.names.values()
+
+    def get(self, name):
+        return self.names.get(name)
+
+    def get_by_ctype(self, ctype):
+        return self.ctypes.get(ctype)
@@ -26,12 +26,14 @@ from __future__ import unicode_literals
 import os
 import sys
 import subprocess
+import time
 
 from . import ast
 from . import message
 from . import utils
 from .cachestore import CacheStore
 from .girparser import GIRParser
+from .nsindex import IndexedNamespace, encode_namespace
 
 
 class TransformerException(Exception):
@@ -42,13 +44,17 @@ class Transformer(object):
     namespace = property(lambda self: self._namespace)
 
     def __init__(self, namespace, accept_unprefixed=False,
-                 identifier_filter_cmd='', symbol_filter_cmd=''):
+                 identifier_filter_cmd='', symbol_filter_cmd='',
+                 parsed_files=None):
         self._cachestore = CacheStore()
         self._accept_unprefixed = accept_unprefixed
         self._namespace = namespace
         self._pkg_config_packages = set()
         self._typedefs_ns = {}
         self._parsed_includes = {}  # <string namespace -> Namespace>
+        self._include_files = {}  # <Include -> string filename>
+        # Optionally shared between transformers to reuse parsed files
+        self._parsed_files = parsed_files  # <string filename -> GIRParser>
         self._includepaths = []
         self._passthrough_mode = False
         self._identifier_filter_cmd = identifier_filter_cmd
@@ -59,9 +65,29 @@ class Transformer(object):
         # https://bugzilla.gnome.org/show_bug.cgi?id=581525
         self._tag_ns = {}
 
+    def __getstate__(self):
+        # The cache store and the parsed files shared with other
+        # transformers are not worth carrying along
+        state = self.__dict__.copy()
+        state['_cachestore'] = None
+        state['_parsed_files'] = None
+        return state
+
     def get_pkgconfig_packages(self):
         return self._pkg_config_packages
 
+    def get_include_files(self):
+        """Return a dictionary mapping the includes processed by this
+transformer, directly or indirectly, to the absolute names of the GIR
+files they have been loaded from."""
+        return self._include_files
+
+    def get_included_namespaces(self):
+        """Return a dictionary mapping the names of the namespaces
+included by this transformer, directly or indirectly, to the namespace
+objects."""
+        return self._parsed_includes
+
     def disable_cache(self):
         self._cachestore = None
 
@@ -146,44 +172,119 @@ None."""
         data_dirs = utils.get_system_data_dirs()
         return data_dirs
 
-    def _find_include(self, include):
+    def _get_include_searchdirs(self):
         searchdirs = self._includepaths[:]
         for path in self._get_gi_data_dirs():
             searchdirs.append(os.path.join(path, 'gir-1.0'))
+        return searchdirs
 
+    def _search_include(self, include):
         girname = '%s-%s.gir' % (include.name, include.version)
-        for d in searchdirs:
+        for d in self._get_include_searchdirs():
             path = os.path.join(d, girname)
             if os.path.exists(path):
                 return path
+        return None
+
+    def _find_include(self, include):
+        path = self._search_include(include)
+        if path is not None:
+            return path
+        girname = '%s-%s.gir' % (include.name, include.version)
+        searchdirs = self._get_include_searchdirs()
         sys.stderr.write("Couldn't find include '%s' (search path: '%s')\n" %
                          (girname, searchdirs))
         sys.exit(1)
 
     @classmethod
-    def parse_from_gir(cls, filename, extra_include_dirs=None):
-        self = cls(None)
+    def parse_from_gir(cls, filename, extra_include_dirs=None,
+                       parsed_files=None, with_docs=True):
+        """Create a transformer for the namespace in a GIR file.
+
+The namespaces included by the file are parsed as well, in the
+types-only mode.  If a dictionary is passed in parsed_files, it is
+used to look up and record the parsers for the files that have been
+parsed, so that they can be reused by other transformers.  If with_docs
+is false, the documentation in the GIR file is not loaded."""
+        self = cls(None, parsed_files=parsed_files)
         if extra_include_dirs is not None:
             self.set_include_paths(extra_include_dirs)
         self.set_passthrough_mode()
-        parser = self._parse_include(filename)
+        parser = self._parse_include(filename, types_only=False,
+                                     with_docs=with_docs)
         self._namespace = parser.get_namespace()
         del self._parsed_includes[self._namespace.name]
         return self
 
-    def _parse_include(self, filename, uninstalled=False):
-        parser = None
+    def load_parser(self, filename, types_only=None, with_docs=True):
+        """Load the parsed data of a GIR file from the cache, or parse
+the file if it is not cached.  The files included by the GIR file are
+not processed.  If types_only is not given, the file is parsed
+in full only in the passthrough mode.  Documentation is only loaded
+in full mode, if with_docs is true."""
+        if types_only is None:
+            types_only = not self._passthrough_mode
+        if types_only:
+            variant = 'types'
+        elif not with_docs:
+            variant = 'nodocs'
+        else:
+            variant = None
+        # Only the namespace is cached, not the state of the parser.
+        # The types-only namespaces of the includes are stored in
+        # the indexed format, so that only the nodes that are looked up
+        # need to be unpickled.
+        if self._cachestore is not None:
+            if types_only:
+                mapped = self._cachestore.load_mapped(filename, variant)
+                if mapped is not None:
+                    buf, offset = mapped
+                    cache_key = (self._cachestore.get_digest(filename),
+                                 variant)
+                    namespace = IndexedNamespace(buf, offset, cache_key)
+                else:
+                    namespace = None
+            else:
+                namespace = self._cachestore.load(filename, variant)
+            if namespace is not None:
+                return GIRParser.from_namespace(namespace,
+                                                types_only=types_only,
+                                                with_docs=with_docs)
+        start_time = time.time()
+        parser = GIRParser(types_only=types_only, with_docs=with_docs)
+        parser.parse(filename)
         if self._cachestore is not None:
-            parser = self._cachestore.load(filename)
+            cost = time.time() - start_time
+            if types_only:
+                self._cachestore.store_bytes(
+                        filename, encode_namespace(parser.get_namespace()),
+                        variant, cost=cost)
+            else:
+                self._cachestore.store(filename, parser.get_namespace(),
+                                       variant, cost=cost)
+        return parser
+
+    def _parse_include(self, filename, uninstalled=False, types_only=True,
+                       with_docs=True):
+        parser = None
+        filename = os.path.abspath(filename)
+        if self._parsed_files is not None:
+            parser = self._parsed_files.get(filename)
+            # A more complete parse can stand in for a less complete one,
+            # but not the other way around
+            if parser is not None and not types_only:
+                if (parser.is_types_only()
+                        or (with_docs and not parser.has_docs())):
+                    parser = None
         if parser is None:
-            parser = GIRParser(types_only=not self._passthrough_mode)
-            parser.parse(filename)
-            if self._cachestore is not None:
-                self._cachestore.store(filename, parser)
+            parser = self.load_parser(filename, types_only, with_docs)
+            if self._parsed_files is not None:
+                self._parsed_files[filename] = parser
 
         for include in parser.get_namespace().includes:
             if include.name not in self._parsed_includes:
-                dep_filename = self._find_include(include)
+                dep_filename = os.path.abspath(self._find_include(include))
+                self._include_files[include] = dep_filename
                 self._parse_include(dep_filename)
 
         if not uninstalled:
@@ -536,7 +637,8 @@ Note that type resolution may not succeed."""
             if container:
                 typeval = container
             else:
-                typeval = self._namespace.type_from_name(typestr)
+                # Interned types are shared, get a copy to resolve
+                typeval = self._namespace.type_from_name(typestr).clone()
         else:
             typeval = self.create_type_from_ctype_string(typestr)
 
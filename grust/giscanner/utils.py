@@ -25,8 +25,6 @@ from __future__ import unicode_literals
 import errno
 import re
 import os
-import subprocess
-import platform
 
 
 _debugflags = None
@@ -109,6 +107,8 @@ def _extract_libdir_field(la_file):
 # Returns the name that we would pass to dlopen() the library
 # corresponding to this .la file
 def extract_libtool_shlib(la_file):
+    import platform
+
     dlname = _extract_dlname_field(la_file)
     if dlname is None:
         return None
@@ -153,6 +153,11 @@ def get_libtool_command(options):
         # we simply split().
         return libtool_path.split(' ')
 
+    # Imported here to keep them out of the startup of the generator,
+    # which does not use libtool
+    import platform
+    import subprocess
+
     libtool_cmd = 'libtool'
     if platform.system() == 'Darwin':
         # libtool on OS X is a completely different program written by Apple
@@ -232,7 +237,7 @@ def makedirs(name, mode=0o777, exist_ok=False):
             # be happy if someone already created the path
             if e.errno != errno.EEXIST:
                 raise
-        if tail == cdir:           # xxx/newdir/. exists if xxx/newdir exists
+        if tail == os.curdir:      # xxx/newdir/. exists if xxx/newdir exists
             return
     try:
         os.mkdir(name, mode)
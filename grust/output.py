@@ -24,6 +24,8 @@ import stat
 import sys
 import tempfile
 
+from .giscanner.utils import files_are_identical
+
 class FileOutput(object):
     """A context manager to atomically overwrite an output file.
 
@@ -34,15 +36,22 @@ class FileOutput(object):
     Upon exiting the context without an exception, the temporary file is
     renamed to the target file name, atomically replacing it. If an
     exception has occurred, the temporary file is deleted.
+
+    Optionally, the target file is left untouched if its content is
+    identical to the newly written output. This preserves the modification
+    time of the file, so that build tools do not consider it updated.
     """
 
-    def __init__(self, filename, mode='w', encoding=None, newline=None):
+    def __init__(self, filename, mode='w', encoding=None, newline=None,
+                 keep_unchanged=False):
         """Create a :class:`FileOutput` object with the target file name.
 
         :param filename: name of the eventual output file
         :param mode: mode parameter to pass to `tempfile.NamedTemporaryFile`
         :param encoding: character encoding as for func:`io.open`
         :param newline: newline mode as for func:`io.open`
+        :param keep_unchanged: if true, do not replace the target file
+                               when the output is identical to its content
         """
         self._filename = os.path.abspath(filename)
         self._open_kwargs = {
@@ -50,6 +59,22 @@ class FileOutput(object):
                 'encoding': encoding,
                 'newline': newline
             }
+        self._keep_unchanged = keep_unchanged
+        self._updated = None
+
+    filename = property(
+        lambda self: self._filename,
+        doc="""Absolute name of the target file.""")
+
+    updated = property(
+        lambda self: self._updated,
+        doc="""Whether the target file has been written.
+
+            This is None until the context has been exited. If the output
+            has been discarded due to an exception, or ``keep_unchanged``
+            has been requested and the content did not change, the value
+            is False.
+            """)
 
     def __enter__(self):
         dirname, basename = os.path.split(self._filename)
@@ -92,10 +117,49 @@ class FileOutput(object):
         self._tempfile.close()
         if exception_type:
             os.remove(self._tempfile.name)
+            self._updated = False
+        elif self._keep_unchanged and self._is_unchanged():
+            os.remove(self._tempfile.name)
+            self._updated = False
         else:
             os.rename(self._tempfile.name, self._filename)
+            self._updated = True
         return False
 
+    def _is_unchanged(self):
+        try:
+            target_size = os.path.getsize(self._filename)
+        except OSError:
+            return False
+        if target_size != os.path.getsize(self._tempfile.name):
+            return False
+        return files_are_identical(self._tempfile.name, self._filename)
+
+def _make_escape(path):
+    if not isinstance(path, bytes):
+        path = path.encode(sys.getfilesystemencoding())
+    return (path.replace(b'$', b'$$')
+                .replace(b'#', b'\\#')
+                .replace(b' ', b'\\ '))
+
+def write_depfile(filename, target, dependencies):
+    """Write a dependency file in the Makefile syntax.
+
+    The file has a single rule listing the dependencies of the target,
+    in the format understood by make and ninja. The file is left
+    untouched if its content does not change.
+
+    :param filename: name of the dependency file
+    :param target: name of the target file as known to the build system
+    :param dependencies: an iterable of names of the files the target
+                         depends on
+    """
+    with FileOutput(filename, mode='wb', keep_unchanged=True) as out:
+        out.write(_make_escape(target) + b':')
+        for dep in dependencies:
+            out.write(b' \\\n  ' + _make_escape(dep))
+        out.write(b'\n')
+
 class DirectOutput(object):
     """A do-nothing context manager around an output stream.
 
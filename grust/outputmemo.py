@@ -0,0 +1,126 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""Skipping the generation of outputs whose inputs have not changed.
+
+An :class:`OutputMemo` records in the cache the inputs an output file
+has been generated from: the digests of the GIR file, of the files of
+all its includes, and of the template files, along with the parameters
+that affect the output. The warnings logged while generating the output
+are recorded as well, so that they can be reported again when
+the generation is skipped. The memo is keyed by the contents of the output
+file, so it no longer applies once the output is modified. As with all
+cache entries, a memo written by a different version of the generator
+is disregarded; the parameters include a digest of the sources of the
+package, so a memo also stops applying when the generator code or
+the bundled templates are modified.
+"""
+
+import hashlib
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from .giscanner.cachestore import CacheStore
+
+class OutputMemo(object):
+    """The memo of inputs for an output file."""
+
+    def __init__(self, output, girfile, params, closure_cache):
+        """Construct a memo for an output file.
+
+        :param output: name of the output file
+        :param girfile: name of the GIR file the output is generated from
+        :param params: a list of strings representing other parameters
+                       that affect the output
+        :param closure_cache: a :class:`grust.closurecache.ClosureCache`
+                              used to check the includes
+        """
+        self._output = output
+        self._girfile = os.path.abspath(girfile)
+        self._closure_cache = closure_cache
+        self._cachestore = CacheStore()
+        key = '\0'.join([os.path.abspath(output), self._girfile]
+                        + list(params))
+        self._variant = 'output {}'.format(
+                hashlib.sha1(key.encode('utf-8')).hexdigest())
+        self._input_files = None
+        self._messages = None
+
+    def is_up_to_date(self):
+        """Check whether the output file has been generated from
+        the same inputs as are currently present.
+        """
+        if not os.path.exists(self._output):
+            return False
+        manifest = self._cachestore.load(self._output, self._variant)
+        if manifest is None:
+            return False
+        includes, files, messages = manifest
+        if not self._closure_cache.includes_unchanged(includes):
+            return False
+        for filename, digest in files:
+            try:
+                if self._cachestore.get_digest(filename) != digest:
+                    return False
+            except (IOError, OSError):
+                return False
+        self._input_files = [filename for filename, _ in files]
+        self._messages = messages
+        return True
+
+    def get_input_files(self):
+        """Return the names of the input files recorded for the output,
+        once :meth:`is_up_to_date` has returned True.
+        """
+        return self._input_files
+
+    def get_messages(self):
+        """Return the messages recorded for the output, once
+        :meth:`is_up_to_date` has returned True.
+
+        :return: a tuple of the text of the messages and their number
+        """
+        return self._messages
+
+    def record(self, transformer, template_files, messages=('', 0)):
+        """Record the inputs of the output file once it's written.
+
+        :param transformer: the :class:`Transformer` for the GIR file
+        :param template_files: names of the template files used
+        :param messages: a tuple of the text of the warnings logged
+                         during the generation and their number
+        """
+        includes = self._closure_cache.get_includes(transformer)
+        filenames = [self._girfile]
+        filenames.extend(filename for _, _, filename in includes)
+        filenames.extend(sorted(os.path.abspath(filename)
+                                for filename in template_files))
+        files = [(filename, self._cachestore.get_digest(filename))
+                 for filename in filenames]
+        try:
+            self._cachestore.store(self._output,
+                                   (includes, files, tuple(messages)),
+                                   self._variant, replace=True)
+        except pickle.PicklingError:
+            # The output is generated again next time
+            pass
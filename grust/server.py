@@ -0,0 +1,290 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""A long running generator process serving requests over a Unix socket.
+
+``grust-gen serve SOCKET`` starts the server. The generator invoked
+with ``--server SOCKET``, or with the environment variable
+``GRUST_GEN_SERVER`` set to the socket path, hands the work over
+to the server using :func:`grust.client.run_client`. The invocations
+in the watch mode, and the batches to be run in parallel with ``--jobs``,
+are still run in the invoking process.
+
+The server keeps the parsed GIR files and the resolved type mappers
+in memory between the requests, in a :class:`grust.session.CachingSession`.
+
+Requests are served one at a time, unless the server is started with
+``--fork``. In that mode, the server process only loads the GIR files
+given with ``--preload``, such as the base GIR files included by all
+crates of a build, and then forks a worker process to serve each request.
+The workers share the memory holding the preloaded namespaces with
+the server process until they modify it, so a number of crates can be
+generated in parallel without each worker loading the base namespaces
+into memory of its own. A worker starts with everything the server has
+loaded, and its own results are discarded when it exits.
+
+A request is a JSON object with
+the members ``args``, ``cwd`` and ``environ``; the response is a JSON
+object with the members ``status``, ``stdout`` and ``stderr``. The client
+closes its side of the connection after sending the request, and
+the server closes the connection after sending the response.
+"""
+
+from __future__ import print_function
+
+import argparse
+import contextlib
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from .client import is_forwarded, receive_all
+from .genmain import run_generator
+from .giscanner import message
+from .giscanner.cachestore import flush_stats
+from .session import CachingSession, frozen_gc
+
+@contextlib.contextmanager
+def _request_environ(environ):
+    saved = dict((name, value) for name, value in os.environ.items()
+                 if is_forwarded(name))
+    for name in saved:
+        del os.environ[name]
+    os.environ.update(environ)
+    try:
+        yield
+    finally:
+        for name in [name for name in os.environ if is_forwarded(name)]:
+            del os.environ[name]
+        os.environ.update(saved)
+
+def _install_logger(output):
+    # The logger is a singleton; a new one for each request starts
+    # the message counts afresh and reports the positions
+    # relative to the working directory of the request
+    message.MessageLogger._instance = message.MessageLogger(output=output)
+
+def _get_exit_status(code, stderr):
+    # Mirror the interpreter's handling of SystemExit
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=stderr)
+    return 1
+
+def _handle_request(request, session):
+    stdout = StringIO()
+    stderr = StringIO()
+    saved_streams = sys.stdout, sys.stderr
+    saved_cwd = os.getcwd()
+    try:
+        os.chdir(request['cwd'])
+        with _request_environ(request['environ']):
+            sys.stdout = stdout
+            sys.stderr = stderr
+            _install_logger(stderr)
+            try:
+                status = run_generator(request['args'], session)
+            except SystemExit as e:
+                status = _get_exit_status(e.code, stderr)
+            except Exception:
+                traceback.print_exc(file=stderr)
+                status = 1
+    except OSError as e:
+        print('cannot serve the request: {}'.format(e), file=stderr)
+        status = 1
+    finally:
+        sys.stdout, sys.stderr = saved_streams
+        os.chdir(saved_cwd)
+    return {
+        'status': status,
+        'stdout': stdout.getvalue(),
+        'stderr': stderr.getvalue()
+    }
+
+def _serve_connection(conn, session):
+    data = receive_all(conn)
+    try:
+        request = json.loads(data.decode('utf-8'))
+    except ValueError:
+        print('ignoring a malformed request', file=sys.stderr)
+        return
+    response = _handle_request(request, session)
+    conn.sendall(json.dumps(response).encode('utf-8'))
+    # Forked workers exit without running the exit handlers,
+    # and the server may run for long
+    flush_stats()
+
+def _bind(sock, socket_path):
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except socket.error:
+            # Left over from a server that has not shut down cleanly
+            os.unlink(socket_path)
+        else:
+            sys.exit('a server is already listening on {}'
+                     .format(socket_path))
+        finally:
+            probe.close()
+    # The server writes files on behalf of its clients,
+    # so only the owner may connect
+    old_umask = os.umask(0o177)
+    try:
+        sock.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+
+def _raise_exit(signum, frame):
+    raise SystemExit(0)
+
+def _serve_in_process(sock, session):
+    while True:
+        conn, _ = sock.accept()
+        try:
+            _serve_connection(conn, session)
+        except socket.error as e:
+            print('lost connection to a client: {}'.format(e),
+                  file=sys.stderr)
+        finally:
+            conn.close()
+
+def _wait_for_workers(workers, max_workers):
+    # Collect the finished workers, waiting for one to finish
+    # if the maximum number of them are running
+    while workers:
+        options = os.WNOHANG if len(workers) < max_workers else 0
+        pid, _ = os.waitpid(-1, options)
+        if pid == 0:
+            break
+        workers.discard(pid)
+
+def _run_worker(sock, conn, session):
+    status = 0
+    try:
+        sock.close()
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        _serve_connection(conn, session)
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        # Leave the socket file and anything else of the server alone
+        sys.stderr.flush()
+        os._exit(status)
+
+def _serve_forking(sock, session, max_workers):
+    workers = set()
+    try:
+        while True:
+            _wait_for_workers(workers, max_workers)
+            conn, _ = sock.accept()
+            try:
+                pid = os.fork()
+                if pid == 0:
+                    _run_worker(sock, conn, session)
+                workers.add(pid)
+            finally:
+                conn.close()
+    finally:
+        # The workers serving their requests are left to finish
+        _wait_for_workers(workers, len(workers) + 1)
+        if workers:
+            print('{} request(s) still being served'.format(len(workers)),
+                  file=sys.stderr)
+
+def serve(socket_path, fork=False, max_workers=1, preload=(),
+          include_dirs=None):
+    """Serve generator requests on a Unix socket until terminated.
+
+    :param socket_path: the file name to create the socket at
+    :param fork: whether to fork a worker process for each request
+    :param max_workers: the maximum number of worker processes
+                        to run at a time
+    :param preload: names of GIR files to load at startup
+    :param include_dirs: a list of additional directories to search
+                         for the files included by the preloaded files
+    """
+    session = CachingSession()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        _bind(sock, socket_path)
+        try:
+            # The clients connecting while the files are preloaded
+            # wait to be served
+            sock.listen(16)
+            signal.signal(signal.SIGTERM, _raise_exit)
+            session.import_modules()
+            session.preload(preload, include_dirs)
+            if fork:
+                with frozen_gc():
+                    _serve_forking(sock, session, max_workers)
+            else:
+                _serve_in_process(sock, session)
+        finally:
+            os.unlink(socket_path)
+    finally:
+        sock.close()
+
+def serve_main(args):
+    arg_parser = argparse.ArgumentParser(
+        prog='grust-gen serve',
+        description='Serve generator requests, keeping the parsed GIR'
+                    ' files in memory')
+    arg_parser.add_argument('socket',
+                            help='file name of the Unix socket to listen on')
+    arg_parser.add_argument('--fork', action='store_true',
+                            help='serve each request in a forked worker'
+                                 ' process')
+    arg_parser.add_argument('-j', '--jobs', type=int, metavar='N',
+                            help='maximum number of worker processes'
+                                 ' in --fork mode; defaults to the number'
+                                 ' of CPUs')
+    arg_parser.add_argument('--preload', action='append', default=[],
+                            metavar='GIRFILE',
+                            help='load the GIR file and the files it'
+                                 ' includes at startup')
+    arg_parser.add_argument('-I', '--include-dir', action='append',
+                            dest='include_dirs', metavar='DIR',
+                            help='add directory to include search path'
+                                 ' for the preloaded files')
+    opts = arg_parser.parse_args(args)
+    if opts.jobs is None:
+        import multiprocessing
+        opts.jobs = multiprocessing.cpu_count()
+    elif opts.jobs < 1:
+        arg_parser.error('the number of jobs must be positive')
+    elif not opts.fork:
+        arg_parser.error('--jobs can only be used with --fork')
+    try:
+        serve(opts.socket, fork=opts.fork, max_workers=opts.jobs,
+              preload=opts.preload, include_dirs=opts.include_dirs)
+    except KeyboardInterrupt:
+        pass
+    return 0
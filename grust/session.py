@@ -0,0 +1,150 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""State reused by the generation runs performed in one process."""
+
+import contextlib
+import gc
+
+@contextlib.contextmanager
+def frozen_gc():
+    """Keep the objects existing on entry out of garbage collection
+    until exit, so that forked child processes share the memory holding
+    them with the parent.
+
+    Objects that survive the collection are not examined by the collector
+    afterwards, so the children don't touch their memory pages and make
+    private copies of them. This has no effect on Python versions
+    lacking :func:`gc.freeze`.
+    """
+    gc.collect()
+    if not hasattr(gc, 'freeze'):
+        yield
+        return
+    gc.freeze()
+    try:
+        yield
+    finally:
+        gc.unfreeze()
+
+class Session(object):
+    """State that the generation runs of a process can reuse.
+
+    A command line invocation performs a single run, so this class keeps
+    nothing. :class:`CachingSession` is used by the processes
+    performing a number of runs over their lifetime.
+    """
+
+    # A dictionary-like object used to look up and record the parsed
+    # GIR files, or None to create one for each batch
+    parsed_files = None
+
+    # A dictionary to keep the resolved mappers in, or None
+    mappers = None
+
+    # Whether batch jobs can be run in a pool of worker processes
+    use_worker_processes = True
+
+    def get_template_lookup(self):
+        from .templating import create_template_lookup
+        return create_template_lookup()
+
+    def get_template(self, tmpl_lookup, filename):
+        from .templating import get_template
+        return get_template(tmpl_lookup, filename)
+
+class _ParsedFiles(object):
+    """A mapping of GIR file names to parsers, suitable to be passed as
+    the ``parsed_files`` parameter of :meth:`Transformer.parse_from_gir`.
+
+    The content digest of the file is recorded with each parser, and
+    the parser is dropped if the file has changed since.
+    """
+
+    def __init__(self, cachestore):
+        self._cachestore = cachestore
+        self._parsers = {}
+
+    def get(self, filename, default=None):
+        entry = self._parsers.get(filename)
+        if entry is None:
+            return default
+        digest, parser = entry
+        if self._cachestore.get_digest(filename) != digest:
+            del self._parsers[filename]
+            return default
+        return parser
+
+    def __setitem__(self, filename, parser):
+        self._parsers[filename] = (self._cachestore.get_digest(filename),
+                                   parser)
+
+    def values(self):
+        return [parser for digest, parser in self._parsers.values()]
+
+class CachingSession(Session):
+    """A session keeping the parsed GIR files and the resolved mappers
+    in memory across the runs.
+
+    The templates are loaded anew for each run, as the template modules
+    may hold state for a single rendering, such as
+    :class:`grust.mapping.Module` objects; they are still compiled only
+    once with the template module cache.
+    """
+
+    # The jobs of a batch are run one by one, keeping the results
+    # in this process
+    use_worker_processes = False
+
+    def __init__(self):
+        from .giscanner.cachestore import CacheStore
+
+        self.parsed_files = _ParsedFiles(CacheStore())
+        self.mappers = {}
+
+    @staticmethod
+    def import_modules():
+        """Import the modules that the generator imports when needed."""
+        from . import templating
+        from .giscanner import transformer
+        from .generators import sys_crate
+        from . import batch, closurecache, output, outputmemo
+        import mako.exceptions
+
+    def preload(self, girfiles, include_dirs=None):
+        """Load GIR files and the files they include, as they are loaded
+        for the includes of a namespace.
+
+        The nodes of the namespaces are all brought into memory,
+        rather than being decoded from the cache as they are looked up.
+        """
+        from .giscanner.nsindex import IndexedNamespace
+        from .giscanner.transformer import Transformer
+
+        transformer = Transformer(None, parsed_files=self.parsed_files)
+        if include_dirs is not None:
+            transformer.set_include_paths(include_dirs)
+        for girfile in girfiles:
+            transformer._parse_include(girfile)
+        # Decoding the nodes here, before any worker is forked, lets
+        # the workers share the memory holding them with the server
+        for parser in self.parsed_files.values():
+            namespace = parser.get_namespace()
+            if isinstance(namespace, IndexedNamespace):
+                namespace.load_all()
@@ -0,0 +1,86 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""Loading of the Mako templates used to generate crates.
+
+This module is imported by the command line driver only when
+a template is actually needed, so that the invocations which
+do not render anything don't pay for importing Mako.
+"""
+
+import os
+import sys
+from mako.lookup import Template, TemplateLookup
+from .giscanner import utils
+
+# The templates are installed as package data next to this module
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'templates')
+
+class TrackingTemplateLookup(TemplateLookup):
+    """A template lookup recording the files of the templates it has
+    provided, including the ones inherited or otherwise referred to
+    by other templates.
+    """
+
+    def __init__(self, *args, **kwargs):
+        TemplateLookup.__init__(self, *args, **kwargs)
+        self.template_files = set()
+
+    def get_template(self, uri):
+        template = TemplateLookup.get_template(self, uri)
+        if template.filename is not None:
+            self.template_files.add(os.path.abspath(template.filename))
+        return template
+
+def create_template_lookup():
+    if 'GRUST_GEN_TEMPLATE_DIR' in os.environ:
+        template_dir = os.environ['GRUST_GEN_TEMPLATE_DIR']
+    else:
+        template_dir = TEMPLATE_DIR
+
+    if 'GRUST_GEN_DISABLE_CACHE' in os.environ:
+        tmpl_module_dir = None
+    else:
+        py_suffix = '-py{}.{}'.format(sys.version_info.major,
+                                      sys.version_info.minor)
+        tmpl_module_dir = utils.get_user_cache_dir(
+                os.path.join('grust-gen', 'template-modules' + py_suffix))
+
+    return TrackingTemplateLookup(directories=[template_dir],
+                                  module_directory=tmpl_module_dir)
+
+def get_template(tmpl_lookup, filename):
+    if filename is None:
+        return tmpl_lookup.get_template('/sys/crate.tmpl')
+    else:
+        return Template(filename=filename,
+                        lookup=tmpl_lookup)
+
+def template_uses_docs(template):
+    # Templates declare that they don't need the documentation
+    # from GIR files by setting uses_gir_docs = False in a module-level
+    # block; if it's not declared, assume that the docs are used.
+    return getattr(template.module, 'uses_gir_docs', True)
+
+def get_template_files(template):
+    files = set(getattr(template.lookup, 'template_files', ()))
+    if template.filename is not None:
+        files.add(os.path.abspath(template.filename))
+    return files
@@ -0,0 +1,89 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+"""Detection of changes in the input files for the watch mode.
+
+The files are polled with ``stat``, which needs no platform-specific
+notification facilities and works the same for files that are modified
+in place and for files replaced by editors saving them atomically.
+"""
+
+import os
+import time
+
+# Seconds between the checks for changes
+POLL_INTERVAL = 0.5
+
+def _get_stamp(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        # A missing file is a state like any other, so that its
+        # creation or removal is noticed as a change
+        return None
+    return (st.st_mtime, st.st_size, st.st_ino)
+
+class FileWatcher(object):
+    """Watches a set of files for changes."""
+
+    def __init__(self):
+        self._stamps = {}
+
+    def watch(self, filenames):
+        """Set the files to watch.
+
+        The files that have already been watched keep the state they
+        were last seen in, so the changes made to them since are not
+        lost. The files added to the set are watched from their
+        current state.
+
+        :param filenames: an iterable of absolute file names
+        """
+        stamps = {}
+        for filename in filenames:
+            if filename in self._stamps:
+                stamps[filename] = self._stamps[filename]
+            else:
+                stamps[filename] = _get_stamp(filename)
+        self._stamps = stamps
+
+    def poll(self):
+        """Check the watched files for changes since the last poll.
+
+        :return: a set of the names of the files that have changed
+        """
+        changed = set()
+        for filename, stamp in self._stamps.items():
+            new_stamp = _get_stamp(filename)
+            if new_stamp != stamp:
+                self._stamps[filename] = new_stamp
+                changed.add(filename)
+        return changed
+
+    def wait(self, interval=POLL_INTERVAL):
+        """Wait until some of the watched files change.
+
+        :param interval: the time between the checks, in seconds
+        :return: a set of the names of the files that have changed
+        """
+        while True:
+            time.sleep(interval)
+            changed = self.poll()
+            if changed:
+                return changed
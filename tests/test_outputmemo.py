@@ -0,0 +1,114 @@
+# grust-gen - Rust binding generator for GObject introspection
+#
+# Copyright (C) 2015  Mikhail Zabaluev <mikhail.zabaluev@gmail.com>
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA
+# 02110-1301  USA
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+try:
+    from unittest import mock
+except ImportError:
+    import mock
+
+try:
+    from StringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from grust import genmain
+from grust.giscanner import cachestore, message
+
+# The sys crate template warns about the union
+GIR_DATA = '''<?xml version="1.0"?>
+<repository version="1.2"
+            xmlns="http://www.gtk.org/introspection/core/1.0"
+            xmlns:c="http://www.gtk.org/introspection/c/1.0">
+  <namespace name="Foo" version="1.0" shared-library="libfoo.so.0"
+             c:identifier-prefixes="Foo" c:symbol-prefixes="foo">
+    <union name="Bar" c:type="FooBar">
+      <field name="x" writable="1">
+        <type name="gint" c:type="int"/>
+      </field>
+    </union>
+    <function name="frob" c:identifier="foo_frob">
+      <return-value transfer-ownership="none">
+        <type name="gint" c:type="int"/>
+      </return-value>
+    </function>
+  </namespace>
+</repository>
+'''
+
+class OutputMemoTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.girfile = os.path.join(self.tmpdir, 'Foo-1.0.gir')
+        with open(self.girfile, 'w') as f:
+            f.write(GIR_DATA)
+        self.output = os.path.join(self.tmpdir, 'lib.rs')
+        environ = {'XDG_CACHE_HOME': os.path.join(self.tmpdir, 'cache')}
+        self.environ_patch = mock.patch.dict(os.environ, environ)
+        self.environ_patch.start()
+        for name in ('GRUST_GEN_SERVER', 'GRUST_GEN_DISABLE_CACHE',
+                     'GRUST_GEN_SHARED_CACHE_DIRS'):
+            os.environ.pop(name, None)
+        self.saved_logger = message.MessageLogger._instance
+
+    def tearDown(self):
+        message.MessageLogger._instance = self.saved_logger
+        # The statistics would be written at exit, once the cache
+        # directory is gone
+        cachestore.flush_stats()
+        self.environ_patch.stop()
+        shutil.rmtree(self.tmpdir)
+
+    def run_generator(self):
+        stderr = StringIO()
+        message.MessageLogger._instance = message.MessageLogger(output=stderr)
+        saved_stderr = sys.stderr
+        sys.stderr = stderr
+        try:
+            genmain.run_generator(['--sys', self.girfile,
+                                   '-o', self.output])
+        finally:
+            sys.stderr = saved_stderr
+        return stderr.getvalue()
+
+    def test_skip_replays_warnings(self):
+        first_messages = self.run_generator()
+        self.assertIn('Warning', first_messages)
+        self.assertIn('Bar', first_messages)
+        with mock.patch.object(genmain, '_generate') as generate:
+            second_messages = self.run_generator()
+        self.assertFalse(generate.called)
+        self.assertEqual(second_messages, first_messages)
+
+    def test_modified_input_is_regenerated(self):
+        self.run_generator()
+        with open(self.girfile, 'a') as f:
+            f.write('\n')
+        with mock.patch.object(genmain, '_generate') as generate:
+            self.run_generator()
+        self.assertTrue(generate.called)
+
+if __name__ == '__main__':
+    unittest.main()